@@ -0,0 +1,64 @@
+import random
+import sys
+import numpy as np
+import os
+
+from BNAIC_paper_files.bluff_analysis import analyze_all_bluffs, print_bluff_analysis
+from BNAIC_paper_files.bluff_plots import check_chart_names, log_bluff_analysis
+from BNAIC_paper_files.game_log import open_game_log
+
+SEED = 42
+
+# === Configs ===
+LOG_PATH = r'C:\Users\zaket\PycharmProjects\Thesis\BNAIC_paper_results\simultaneous_Evaluation_100K\evaluation_game_log_100K'
+PROJECT_NAME = 'BNAIC-bluff-analysis-52card'
+# One W&B run per bluffer, indexed by its player id (0: DQN bluffs against CFR, 1: CFR bluffs against DQN)
+RUN_NAMES = ['CFR_Reaction_to_DQN_Bluffs_52Card_Leduc_CLEAR_LABELS',
+             'DQN_Reaction_to_CFR_Bluffs_52Card_Leduc_CLEAR_LABELS']
+# Names of the charts to log (see bluff_plots.CHART_NAMES), None for all, [] for the summary metrics only
+CHARTS = None
+# >0 renders the charts in a process pool of that size
+PLOT_WORKERS = 0
+# False only prints the analysis, without importing wandb or matplotlib
+LOG_TO_WANDB = True
+
+
+def main():
+    """Threshold bluff analysis of both bluffer / reactor pairings from one read of the log"""
+    np.random.seed(SEED)
+    random.seed(SEED)
+    check_chart_names(CHARTS)
+
+    # === Analysis (see bluff_analysis.py) ===
+    print(f"Loading logs from: {LOG_PATH}")
+    if not os.path.exists(LOG_PATH):
+        print(f"ERROR: Log file not found at {LOG_PATH}")
+        sys.exit(1)
+
+    all_results = analyze_all_bluffs(open_game_log(LOG_PATH))
+
+    for results in all_results:
+        if LOG_TO_WANDB:
+            import wandb
+
+            wandb.init(project=PROJECT_NAME, name=RUN_NAMES[results['bluffer_id']])
+
+        print_bluff_analysis(results)
+
+        # === Log to W&B ===
+        if LOG_TO_WANDB:
+            log_bluff_analysis(results, CHARTS, PLOT_WORKERS)
+            wandb.finish()
+
+        print("\n" + "=" * 80)
+        print("ANALYSIS COMPLETE WITH CLEAR ATTEMPT/SUCCESS SEPARATION")
+        print("=" * 80)
+        print(f"Key Insight: Out of {results['total_bluff_attempts']} bluff attempts, {results['total_bluff_successes']} succeeded")
+        print(f"This gives a {results['bluff_success_rate']:.1%} success rate for {results['bluffer']}'s weak hand raises "
+              f"against {results['reactor']}")
+
+    return all_results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,266 @@
+from collections import Counter
+from itertools import compress
+
+import numpy as np
+
+from BNAIC_paper_files.custom_leduc_rlcard.batch_game import CALL, RAISE, FOLD, CHECK
+from BNAIC_paper_files.custom_leduc_rlcard.utils import INDEX2CARD, NO_PUBLIC_CARD, SHOWDOWN_STRENGTH
+from BNAIC_paper_files.game_log import GameLog, open_game_log, NO_CARD
+
+# Player ids of the evaluation games
+PLAYER_NAMES = ['DQN', 'CFR']
+
+# A raise is a bluff attempt below this showdown strength (HAND_SCORES = rank * 4 + suit): no pair
+# and a card below the Ts, i.e. ranks 2-9
+BLUFF_STRENGTH_THRESHOLD = 32
+
+action_id_to_name = {0: 'call', 1: 'raise', 2: 'fold', 3: 'check'}
+
+
+def bluff_attempt_mask(columns, player_id):
+    """Raises by player_id with a hand below the Ts (ranks 2-9, no pair; score below 32), as an array over steps"""
+    public = np.where(columns.public_card == NO_CARD, NO_PUBLIC_CARD, columns.public_card)
+    strength = SHOWDOWN_STRENGTH[columns.hand, public]
+    return (columns.player == player_id) & (columns.action == RAISE) & (strength < BLUFF_STRENGTH_THRESHOLD)
+
+
+def get_hand_category(hand):
+    if len(hand) >= 2:
+        rank = hand[1]
+        suit = hand[0]
+        return f"{rank}{suit}"
+    return hand
+
+
+def get_rank_group(hand):
+    if len(hand) >= 2:
+        rank = hand[1]
+        if rank in ['2', '3', '4', '5', '6']:
+            return 'Low (2-6)'
+        elif rank in ['7', '8', '9', 'T']:
+            return 'Medium (7-T)'
+        elif rank in ['J', 'Q']:
+            return 'High (J-Q)'
+        elif rank in ['K', 'A']:
+            return 'Premium (K-A)'
+    return 'Unknown'
+
+
+def analyze_bluffs(log, bluffer_id):
+    """
+    Threshold bluff analysis of one bluffer against the other player.
+
+    Args:
+        log (GameLog): The evaluation games
+        bluffer_id (int): Player whose bluff attempts are analysed, the other player is the reactor
+
+    Returns:
+        (dict): Attempt and success counts (also by hand, rank and rank group), the reactor's
+            reactions and the attempt outcomes. Counters list hands in order of first attempt.
+    """
+    columns = log.columns()
+    reactor_id = 1 - bluffer_id
+
+    attempts = np.flatnonzero(bluff_attempt_mask(columns, bluffer_id))
+    reactions, reaction_rounds = columns.reactions(attempts)
+    reacted = reactions >= 0
+    won = columns.payoffs[attempts, bluffer_id] > 0
+
+    hands = [INDEX2CARD[card] for card in columns.hand[attempts].tolist()]
+    hand_cats = [get_hand_category(hand) for hand in hands]
+    ranks = [hand[1] for hand in hands]
+    rank_groups = [get_rank_group(hand) for hand in hands]
+    reaction_names = [action_id_to_name[action] for action in reactions[reacted].tolist()]
+    after_public = reaction_rounds[reacted] > 0
+    folded = reactions == FOLD
+
+    total_actions = int(np.count_nonzero(columns.player == bluffer_id))
+    total_bluff_attempts = len(attempts)
+    total_bluff_successes = int(np.count_nonzero(folded))  # Only when opponent folds
+
+    bluff_attempt_outcomes = {
+        'opponent_folded': total_bluff_successes,  # SUCCESS: Opponent folded to our bluff
+        'opponent_called': int(np.count_nonzero(reactions == CALL)),  # FAILED: Opponent called our bluff
+        'opponent_raised': int(np.count_nonzero(reactions == RAISE)),  # FAILED: Opponent re-raised our bluff
+        'opponent_checked': int(np.count_nonzero(reactions == CHECK)),  # FAILED: Opponent checked (shouldn't happen after raise)
+        'showdown_won': int(np.count_nonzero((reactions == CALL) & won)),  # LUCKY: We bluffed, got called, but won anyway
+        'showdown_lost': int(np.count_nonzero((reactions == CALL) & ~won))  # EXPECTED: We bluffed, got called, and lost
+    }
+    immediate_successes = bluff_attempt_outcomes['opponent_folded']
+    lucky_wins = bluff_attempt_outcomes['showdown_won']
+
+    return {
+        'bluffer': PLAYER_NAMES[bluffer_id],
+        'reactor': PLAYER_NAMES[reactor_id],
+        'bluffer_id': bluffer_id,
+        'total_games': len(log),
+        'total_actions': total_actions,
+        'total_bluff_attempts': total_bluff_attempts,
+        'total_bluff_successes': total_bluff_successes,
+        'bluff_attempt_rate': total_bluff_attempts / total_actions if total_actions > 0 else 0,
+        'bluff_success_rate': total_bluff_successes / total_bluff_attempts if total_bluff_attempts > 0 else 0,
+        'bluff_attempt_outcomes': bluff_attempt_outcomes,
+        'bluff_attempts_by_hand': Counter(hand_cats),
+        'bluff_attempts_by_rank': Counter(ranks),
+        'bluff_attempts_by_rank_group': Counter(rank_groups),
+        'bluff_successes_by_hand': Counter(compress(hand_cats, folded)),
+        'bluff_successes_by_rank': Counter(compress(ranks, folded)),
+        'bluff_successes_by_rank_group': Counter(compress(rank_groups, folded)),
+        'opponent_reactions': Counter(reaction_names),
+        'reactions_before_public': Counter(compress(reaction_names, ~after_public)),
+        'reactions_after_public': Counter(compress(reaction_names, after_public)),
+        'reaction_by_bluff_hand': {action: Counter(compress(hand_cats, reactions == action)) for action in range(4)},
+        'first_attempts': [(hand, action_id_to_name.get(reaction)) for hand, reaction in zip(hands[:5], reactions[:5].tolist())],
+        'immediate_successes': immediate_successes,
+        'lucky_wins': lucky_wins,
+        'total_positive_outcomes': immediate_successes + lucky_wins,
+    }
+
+
+def merge_bluff_results(results, other):
+    """
+    Add the analyze_bluffs result of the games that follow (e.g. the next evaluation batch or
+    shard, same bluffer) into results, in place. Merging the parts of a log in order gives the
+    result of analyze_bluffs on the whole log.
+    """
+    for key in ('total_games', 'total_actions', 'total_bluff_attempts', 'total_bluff_successes',
+                'immediate_successes', 'lucky_wins', 'total_positive_outcomes'):
+        results[key] += other[key]
+    for key in ('bluff_attempts_by_hand', 'bluff_attempts_by_rank', 'bluff_attempts_by_rank_group',
+                'bluff_successes_by_hand', 'bluff_successes_by_rank', 'bluff_successes_by_rank_group',
+                'opponent_reactions', 'reactions_before_public', 'reactions_after_public'):
+        results[key].update(other[key])
+    for outcome, count in other['bluff_attempt_outcomes'].items():
+        results['bluff_attempt_outcomes'][outcome] += count
+    for action, counts in other['reaction_by_bluff_hand'].items():
+        results['reaction_by_bluff_hand'][action].update(counts)
+    results['first_attempts'] = (results['first_attempts'] + other['first_attempts'])[:5]
+
+    total_actions, total_bluff_attempts = results['total_actions'], results['total_bluff_attempts']
+    results['bluff_attempt_rate'] = total_bluff_attempts / total_actions if total_actions > 0 else 0
+    results['bluff_success_rate'] = results['total_bluff_successes'] / total_bluff_attempts if total_bluff_attempts > 0 else 0
+    return results
+
+
+def analyze_all_bluffs(log):
+    """
+    Threshold bluff analysis of every bluffer / reactor pairing on one read of the log.
+
+    Args:
+        log (GameLog or str): The log, or a path accepted by game_log.open_game_log
+
+    Returns:
+        (list): analyze_bluffs results, indexed by the bluffer's player id
+    """
+    if not isinstance(log, GameLog):
+        log = open_game_log(log)
+    return [analyze_bluffs(log, bluffer_id) for bluffer_id in range(len(PLAYER_NAMES))]
+
+
+def print_bluff_analysis(results):
+    """Print the report of one analyze_bluffs result"""
+    bluffer, reactor = results['bluffer'], results['reactor']
+    total_bluff_attempts = results['total_bluff_attempts']
+    bluff_attempt_rate, bluff_success_rate = results['bluff_attempt_rate'], results['bluff_success_rate']
+    immediate_successes, lucky_wins = results['immediate_successes'], results['lucky_wins']
+    total_positive_outcomes = results['total_positive_outcomes']
+
+    for attempt, (hand, opponent_reaction) in enumerate(results['first_attempts'], start=1):
+        success = "SUCCESS" if opponent_reaction == 'fold' else "FAILED"
+        print(
+            f"DEBUG Attempt #{attempt}: {hand} -> {reactor} {opponent_reaction} -> {success}")
+
+    print("\n" + "=" * 80)
+    print(f"{bluffer} BLUFF ANALYSIS - ATTEMPTS vs SUCCESSES")
+    print("=" * 80)
+
+    print(f"\n=== BASIC METRICS ===")
+    print(f"Total Games: {results['total_games']}")
+    print(f"{bluffer} Total Actions: {results['total_actions']}")
+    print(f"")
+    print(f"BLUFF ATTEMPTS (raise with 9 or lower (no pair)): {total_bluff_attempts}")
+    print(f"Bluff Attempt Rate: {bluff_attempt_rate:.3f} ({bluff_attempt_rate * 100:.1f}%)")
+    print(f"")
+    print(f"BLUFF SUCCESSES ({reactor} folded): {results['total_bluff_successes']}")
+    print(f"Bluff Success Rate: {bluff_success_rate:.3f} ({bluff_success_rate * 100:.1f}%)")
+
+    print(f"\n=== {reactor} REACTIONS TO BLUFF ATTEMPTS ===")
+    opponent_reactions = results['opponent_reactions']
+    total_reactions = sum(opponent_reactions.values())
+    for reaction, count in opponent_reactions.most_common():
+        percentage = (count / total_reactions) * 100 if total_reactions > 0 else 0
+        print(f"  {reaction}: {count} ({percentage:.1f}%)")
+
+    print(f"\n=== REACTIONS BY CONTEXT ===")
+    print("Before Public Card (Pre-flop):")
+    reactions_before_public = results['reactions_before_public']
+    total_pre = sum(reactions_before_public.values())
+    for reaction, count in reactions_before_public.most_common():
+        percentage = (count / total_pre) * 100 if total_pre > 0 else 0
+        print(f"  {reaction}: {count} ({percentage:.1f}%)")
+
+    print("After Public Card (Post-flop):")
+    reactions_after_public = results['reactions_after_public']
+    total_post = sum(reactions_after_public.values())
+    for reaction, count in reactions_after_public.most_common():
+        percentage = (count / total_post) * 100 if total_post > 0 else 0
+        print(f"  {reaction}: {count} ({percentage:.1f}%)")
+
+    print(f"\n=== DETAILED BLUFF ATTEMPT OUTCOMES ===")
+    for outcome, count in results['bluff_attempt_outcomes'].items():
+        percentage = (count / total_bluff_attempts) * 100 if total_bluff_attempts > 0 else 0
+        print(f"  {outcome.replace('_', ' ').title()}: {count} ({percentage:.1f}%)")
+
+    print(f"\n=== SUCCESS BREAKDOWN ===")
+    print(
+        f"  Immediate successes ({reactor} folded): {immediate_successes}/{total_bluff_attempts} ({(immediate_successes / total_bluff_attempts * 100 if total_bluff_attempts > 0 else 0):.1f}%)")
+    print(
+        f"  Lucky wins (called but won): {lucky_wins}/{total_bluff_attempts} ({(lucky_wins / total_bluff_attempts * 100 if total_bluff_attempts > 0 else 0):.1f}%)")
+    print(
+        f"  Total positive outcomes: {total_positive_outcomes}/{total_bluff_attempts} ({(total_positive_outcomes / total_bluff_attempts * 100 if total_bluff_attempts > 0 else 0):.1f}%)")
+
+    print(f"\n=== BLUFF ATTEMPTS BY RANK GROUP ===")
+    attempts_by_rank_group = results['bluff_attempts_by_rank_group']
+    for group, count in attempts_by_rank_group.most_common():
+        percentage = (count / total_bluff_attempts) * 100 if total_bluff_attempts > 0 else 0
+        print(f"  {group}: {count} ({percentage:.1f}%)")
+
+    print(f"\n=== BLUFF SUCCESSES BY RANK GROUP ===")
+    for group, count in results['bluff_successes_by_rank_group'].most_common():
+        success_rate = count / attempts_by_rank_group[group] * 100 if attempts_by_rank_group[group] > 0 else 0
+        print(f"  {group}: {count} successes / {attempts_by_rank_group[group]} attempts ({success_rate:.1f}%)")
+
+    print(f"\n=== BLUFF ATTEMPTS BY INDIVIDUAL RANK ===")
+    for rank, count in results['bluff_attempts_by_rank'].most_common():
+        percentage = (count / total_bluff_attempts) * 100 if total_bluff_attempts > 0 else 0
+        print(f"  {rank}: {count} ({percentage:.1f}%)")
+
+    attempts_by_hand, successes_by_hand = results['bluff_attempts_by_hand'], results['bluff_successes_by_hand']
+    print(f"\n=== TOP 10 MOST ATTEMPTED BLUFF HANDS ===")
+    for hand, attempt_count in attempts_by_hand.most_common(10):
+        success_count = successes_by_hand.get(hand, 0)
+        success_rate = success_count / attempt_count * 100 if attempt_count > 0 else 0
+        print(f"  {hand}: {attempt_count} attempts, {success_count} successes ({success_rate:.1f}%)")
+
+    print(f"\n=== TOP 10 MOST SUCCESSFUL BLUFF HANDS ===")
+    for hand, success_count in successes_by_hand.most_common(10):
+        attempt_count = attempts_by_hand[hand]
+        success_rate = success_count / attempt_count * 100 if attempt_count > 0 else 0
+        print(f"  {hand}: {success_count} successes / {attempt_count} attempts ({success_rate:.1f}%)")
+
+
+def summary_stats(results):
+    """Summary metrics of one analyze_bluffs result, as logged to W&B"""
+    total_bluff_attempts = results['total_bluff_attempts']
+    return {
+        'Total Games': results['total_games'],
+        f"{results['bluffer']} Total Actions": results['total_actions'],
+        'Total Bluff Attempts': total_bluff_attempts,
+        'Bluff Attempt Rate': round(results['bluff_attempt_rate'], 3),
+        'Total Bluff Successes': results['total_bluff_successes'],
+        'Bluff Success Rate': round(results['bluff_success_rate'], 3),
+        'Immediate Success Rate': round(results['immediate_successes'] / total_bluff_attempts, 3) if total_bluff_attempts > 0 else 0,
+        'Lucky Win Rate': round(results['lucky_wins'] / total_bluff_attempts, 3) if total_bluff_attempts > 0 else 0,
+        'Total Positive Outcome Rate': round(results['total_positive_outcomes'] / total_bluff_attempts,
+                                             3) if total_bluff_attempts > 0 else 0,
+    }
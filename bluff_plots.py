@@ -0,0 +1,256 @@
+from collections import namedtuple
+
+import numpy as np
+
+from BNAIC_paper_files.bluff_analysis import summary_stats
+
+# Chart colors of each bluffer: (attempts, attempts by rank group)
+PLAYER_COLORS = {'DQN': ('red', 'darkred'), 'CFR': ('blue', 'darkblue')}
+
+# A chart to be drawn from analysis results: plain data only, so charts can be built and selected
+# without importing matplotlib and rendered in other processes. name is the short id used to
+# select charts, title the W&B key, and kind picks the drawing function that gets args.
+Chart = namedtuple('Chart', ['name', 'title', 'kind', 'args'])
+
+# Names of the charts of the threshold and statistical bluff analyses, in logging order
+CHART_NAMES = (
+    'belief_distribution',  # Statistical analysis only
+    'opponent_reactions',
+    'reactions_before_public',
+    'reactions_after_public',
+    'attempts_by_rank',
+    'successes_by_rank',
+    'attempts_by_rank_group',
+    'successes_by_rank_group',
+    'attempts_by_hand',
+    'successes_by_hand',
+    'success_rate_by_hand',
+    'attempt_outcomes',
+    'attempts_vs_successes_by_rank',
+    'folds_by_hand',  # Threshold analysis only
+)
+
+
+def _label_axes(ax, title, xlabel, ylabel, rotate_labels=True):
+    ax.set_title(title, fontsize=14, fontweight='bold')
+    ax.set_xlabel(xlabel, fontsize=12)
+    ax.set_ylabel(ylabel, fontsize=12)
+    if rotate_labels:
+        ax.tick_params(axis='x', labelrotation=45)
+        for label in ax.get_xticklabels():
+            label.set_horizontalalignment('right')
+    ax.grid(axis='y', alpha=0.3)
+
+
+def _draw_bar(fig, title, data, xlabel, ylabel, color):
+    """Bars of the 15 largest values of a dict"""
+    ax = fig.subplots()
+    sorted_items = sorted(data.items(), key=lambda x: x[1], reverse=True)[:15]  # Top 15
+    keys, values = zip(*sorted_items)
+    bars = ax.bar(keys, values, color=color, alpha=0.7, edgecolor='black')
+
+    for bar, value in zip(bars, values):
+        ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 0.01,
+                f'{value}', ha='center', va='bottom', fontsize=8)
+
+    _label_axes(ax, title, xlabel, ylabel)
+
+
+def _draw_outcomes(fig, title, outcomes):
+    """One bar per bluff attempt outcome"""
+    ax = fig.subplots()
+    counts = list(outcomes.values())
+    colors = ['green', 'orange', 'red', 'gray', 'lightgreen', 'pink']
+    bars = ax.bar(list(outcomes.keys()), counts, color=colors, alpha=0.7, edgecolor='black')
+
+    for bar, count in zip(bars, counts):
+        if count > 0:
+            ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 0.5,
+                    f'{count}', ha='center', va='bottom')
+
+    _label_axes(ax, title, 'Outcome', 'Count')
+
+
+def _draw_attempts_vs_successes(fig, title, ranks, attempts, successes):
+    """Attempt and success counts side by side for each rank"""
+    ax = fig.subplots()
+    x = range(len(ranks))
+    width = 0.35
+
+    ax.bar([i - width / 2 for i in x], attempts, width, label='Attempts', color='red', alpha=0.7)
+    ax.bar([i + width / 2 for i in x], successes, width, label='Successes', color='green', alpha=0.7)
+
+    ax.set_xticks(list(x))
+    ax.set_xticklabels(ranks)
+    ax.legend()
+    _label_axes(ax, title, 'Rank', 'Count', rotate_labels=False)
+
+
+def _draw_belief_distribution(fig, title, player_name, pair_count, non_pair_count, non_pair_histogram):
+    """Pair / non-pair split of the raises in one context, and the non-pair strength histogram"""
+    ax1, ax2 = fig.subplots(1, 2)
+
+    # Pie chart
+    ax1.pie([pair_count, non_pair_count], labels=['Pairs', 'Non-pairs'], autopct='%1.1f%%',
+            colors=['gold', 'lightblue'])
+    ax1.set_title(f'{player_name}: Pair vs Non-pair Raises')
+
+    # Histogram
+    if non_pair_count:
+        ax2.hist(np.arange(len(non_pair_histogram)), bins=range(0, 53, 2), weights=non_pair_histogram, alpha=0.7,
+                 color='lightblue', edgecolor='black')
+        ax2.set_xlabel('Hand Strength')
+        ax2.set_ylabel('Count')
+        ax2.set_title(f'{player_name}: Non-pair Strength Distribution')
+        ax2.grid(True, alpha=0.3)
+
+
+# Drawing function and figure size of each chart kind
+_CHART_KINDS = {
+    'bar': (_draw_bar, (10, 6)),
+    'outcomes': (_draw_outcomes, (12, 6)),
+    'attempts_vs_successes': (_draw_attempts_vs_successes, (12, 6)),
+    'belief_distribution': (_draw_belief_distribution, (12, 5)),
+}
+
+
+def render_chart(chart):
+    """Draw one Chart off-screen and return its pixels as an RGBA array"""
+    # Imported here so that runs which only need the numbers never load matplotlib
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    draw, figsize = _CHART_KINDS[chart.kind]
+    fig = Figure(figsize=figsize)
+    canvas = FigureCanvasAgg(fig)
+    draw(fig, chart.title, *chart.args)
+    fig.tight_layout()
+    canvas.draw()
+    return np.asarray(canvas.buffer_rgba()).copy()
+
+
+def check_chart_names(names):
+    """Raise ValueError if a chart name (None selects all charts) is not in CHART_NAMES"""
+    if names is None:
+        return
+    unknown = set(names).difference(CHART_NAMES)
+    if unknown:
+        raise ValueError(f"Unknown chart names {sorted(unknown)}, expected names from {CHART_NAMES}")
+
+
+def log_charts(charts, names=None, workers=0):
+    """
+    Render charts and log each to the active W&B run under its title.
+
+    Args:
+        charts (list): Chart specs, in logging order
+        names (iterable): Names of the charts to render (see CHART_NAMES), None for all of them.
+            Raises ValueError on a name that is not in CHART_NAMES.
+        workers (int): >0 renders the charts in a process pool of that size while the main
+            process logs them. Where processes are spawned (Windows), the calling script must
+            keep its top-level code under an if __name__ == '__main__' guard.
+    """
+    check_chart_names(names)
+    if names is not None:
+        names = set(names)
+        charts = [chart for chart in charts if chart.name in names]
+    if not charts:
+        return
+
+    import wandb
+
+    if workers > 0 and len(charts) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(min(workers, len(charts))) as pool:
+            for chart, image in zip(charts, pool.map(render_chart, charts)):
+                wandb.log({chart.title: wandb.Image(image)})
+    else:
+        for chart in charts:
+            wandb.log({chart.title: wandb.Image(render_chart(chart))})
+
+
+def bluff_charts(results):
+    """Charts of one bluff_analysis.analyze_bluffs result"""
+    bluffer, reactor = results['bluffer'], results['reactor']
+    color, dark_color = PLAYER_COLORS[bluffer]
+    charts = []
+
+    def bar(name, data, title, xlabel, ylabel, bar_color):
+        if data:
+            charts.append(Chart(name, title, 'bar', (data, xlabel, ylabel, bar_color)))
+
+    # 1. Reactions to bluff attempts
+    bar('opponent_reactions', results['opponent_reactions'], f'{reactor} Reactions to {bluffer} Bluff ATTEMPTS',
+        f'{reactor} Action', 'Count', color)
+
+    # 2. Pre/Post flop context
+    bar('reactions_before_public', results['reactions_before_public'],
+        f'{reactor} Reactions to Bluff ATTEMPTS (Pre-flop)', f'{reactor} Action', 'Count', color)
+    bar('reactions_after_public', results['reactions_after_public'],
+        f'{reactor} Reactions to Bluff ATTEMPTS (Post-flop)', f'{reactor} Action', 'Count', color)
+
+    # 3. Bluff attempts by rank
+    bar('attempts_by_rank', results['bluff_attempts_by_rank'], f'{bluffer} Bluff ATTEMPTS by Card Rank', 'Rank',
+        'Attempt Count', color)
+
+    # 4. Bluff successes by rank
+    bar('successes_by_rank', results['bluff_successes_by_rank'], f'{bluffer} Bluff SUCCESSES by Card Rank', 'Rank',
+        'Success Count', 'green')
+
+    # 5. Bluff attempts by rank group
+    bar('attempts_by_rank_group', results['bluff_attempts_by_rank_group'], f'{bluffer} Bluff ATTEMPTS by Rank Group',
+        'Rank Group', 'Attempt Count', dark_color)
+
+    # 6. Bluff successes by rank group
+    bar('successes_by_rank_group', results['bluff_successes_by_rank_group'],
+        f'{bluffer} Bluff SUCCESSES by Rank Group', 'Rank Group', 'Success Count', 'darkgreen')
+
+    # 7. Most attempted bluff hands
+    bar('attempts_by_hand', results['bluff_attempts_by_hand'], f'Top 15 {bluffer} Bluff ATTEMPT Hands', 'Hand',
+        'Attempt Count', color)
+
+    # 8. Most successful bluff hands
+    bar('successes_by_hand', results['bluff_successes_by_hand'], f'Top 15 {bluffer} Bluff SUCCESS Hands', 'Hand',
+        'Success Count', 'green')
+
+    # 9. Success rate by hand (only for hands with multiple attempts)
+    success_rates_by_hand = {}
+    for hand, attempts in results['bluff_attempts_by_hand'].items():
+        successes = results['bluff_successes_by_hand'].get(hand, 0)
+        if attempts >= 3:  # Only show hands with at least 3 attempts
+            success_rates_by_hand[hand] = successes / attempts
+    bar('success_rate_by_hand', success_rates_by_hand, 'Bluff Success Rate by Hand (min 3 attempts)', 'Hand',
+        'Success Rate', 'purple')
+
+    # 10. Bluff attempt outcomes distribution
+    bluff_attempt_outcomes = results['bluff_attempt_outcomes']
+    if bluff_attempt_outcomes and sum(bluff_attempt_outcomes.values()) > 0:
+        charts.append(Chart('attempt_outcomes', f'{bluffer} Bluff Attempt Outcomes Distribution', 'outcomes',
+                            (bluff_attempt_outcomes,)))
+
+    # 11. Success rate comparison by rank
+    if results['bluff_attempts_by_rank'] and results['bluff_successes_by_rank']:
+        ranks = sorted(results['bluff_attempts_by_rank'].keys())
+        attempts = [results['bluff_attempts_by_rank'][rank] for rank in ranks]
+        successes = [results['bluff_successes_by_rank'].get(rank, 0) for rank in ranks]
+        charts.append(Chart('attempts_vs_successes_by_rank', f'{bluffer} Bluff Attempts vs Successes by Rank',
+                            'attempts_vs_successes', (ranks, attempts, successes)))
+
+    # 12. Fold reactions by bluffing hand
+    bar('folds_by_hand', results['reaction_by_bluff_hand'][2], f'{reactor} Fold Reactions by {bluffer} Bluff Hand',
+        'Bluff Hand', 'Fold Count', 'green')
+
+    return charts
+
+
+def log_bluff_analysis(results, charts=None, workers=0):
+    """
+    Log the summary metrics of one bluff_analysis.analyze_bluffs result to the active W&B run,
+    then the charts named in charts (all by default, none for []; see log_charts).
+    """
+    check_chart_names(charts)
+    import wandb
+
+    wandb.log(summary_stats(results))
+    log_charts(bluff_charts(results), charts, workers)
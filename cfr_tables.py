@@ -0,0 +1,110 @@
+import numpy as np
+
+from BNAIC_paper_files.custom_leduc_rlcard.infoset import NUM_INFOSETS, is_bytes_keyed, migrate_cfr_data
+
+
+class DenseCFRTables:
+    """
+    Regrets and strategies of every info set, stored as contiguous (num_infosets, num_actions) arrays.
+    Rows are indexed by the dense info-set ids of custom_leduc_rlcard.infoset.
+    """
+
+    def __init__(self, num_infosets=NUM_INFOSETS, num_actions=4):
+        self.num_infosets = num_infosets
+        self.num_actions = num_actions
+
+        self.regrets = np.zeros((num_infosets, num_actions))
+        self.average_policy = np.zeros((num_infosets, num_actions))
+        # Last strategy played at each info set
+        self.policy = np.zeros((num_infosets, num_actions))
+        # Info sets the CFR player has reached
+        self.visited = np.zeros(num_infosets, dtype=bool)
+
+    def regret_matching(self, infoset, out=None):
+        """Current strategy of one info set, optionally written into a preallocated row"""
+        if out is None:
+            pos_regret = np.maximum(self.regrets[infoset], 0)
+            total = np.sum(pos_regret)
+            return pos_regret / total if total > 0 else np.ones(self.num_actions) / self.num_actions
+        np.maximum(self.regrets[infoset], 0, out=out)
+        total = np.sum(out)
+        if total > 0:
+            out /= total
+        else:
+            out.fill(1 / self.num_actions)
+        return out
+
+    def current_strategies(self):
+        """Regret matching for all info sets in one pass"""
+        pos_regret = np.maximum(self.regrets, 0)
+        total = pos_regret.sum(axis=1, keepdims=True)
+        uniform = np.full_like(pos_regret, 1 / self.num_actions)
+        return np.divide(pos_regret, total, out=uniform, where=total > 0)
+
+    def average_strategies(self):
+        """Normalized average policy of all info sets, uniform where nothing was accumulated"""
+        total = self.average_policy.sum(axis=1, keepdims=True)
+        uniform = np.full_like(self.average_policy, 1 / self.num_actions)
+        return np.divide(self.average_policy, total, out=uniform, where=total > 0)
+
+    def total_regret(self):
+        return float(np.abs(self.regrets).sum())
+
+    def num_visited(self):
+        return int(np.count_nonzero(self.visited))
+
+    def clear(self):
+        """Zero all tables in place, keeping any aliases to the arrays valid"""
+        self.regrets.fill(0)
+        self.average_policy.fill(0)
+        self.policy.fill(0)
+        self.visited.fill(False)
+
+    def sparse_delta(self):
+        """
+        Rows of the visited info sets as (infosets, regrets, average_policy, policy).
+        On tables that started from zero these are the updates since the last clear().
+        """
+        infosets = np.flatnonzero(self.visited)
+        return infosets, self.regrets[infosets], self.average_policy[infosets], self.policy[infosets]
+
+    def add_sparse_delta(self, delta):
+        """Merge a sparse_delta() of another table: regrets and average policy are added, policy is replaced"""
+        infosets, regrets, average_policy, policy = delta
+        self.regrets[infosets] += regrets
+        self.average_policy[infosets] += average_policy
+        self.policy[infosets] = policy
+        self.visited[infosets] = True
+
+    def to_data(self):
+        """Arrays in the layout written by CFRAgainstDQNAgent.save()"""
+        return {
+            'policy': self.policy,
+            'average_policy': self.average_policy,
+            'regrets': self.regrets,
+            'visited': self.visited,
+        }
+
+    @classmethod
+    def from_data(cls, data, num_actions=4):
+        """
+        Build tables from a loaded CFR pickle. Accepts the dense layout as well as the older
+        dicts keyed by info-set id or by obs.tobytes().
+        """
+        if isinstance(data['average_policy'], np.ndarray):
+            tables = cls(num_infosets=len(data['average_policy']), num_actions=num_actions)
+            tables.policy[:] = data['policy']
+            tables.average_policy[:] = data['average_policy']
+            tables.regrets[:] = data['regrets']
+            tables.visited[:] = data['visited']
+            return tables
+
+        if is_bytes_keyed(data):
+            data = migrate_cfr_data(data)
+        tables = cls(num_actions=num_actions)
+        for name in ('policy', 'average_policy', 'regrets'):
+            table = getattr(tables, name)
+            for infoset, values in data.get(name, {}).items():
+                table[infoset] = values
+        tables.visited[list(data['average_policy'].keys())] = True
+        return tables
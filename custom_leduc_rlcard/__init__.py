@@ -1,6 +1,23 @@
-from .dealer import LeducholdemDealer as Dealer
-from .judger import LeducholdemJudger as Judger
-from .player import LeducholdemPlayer as Player
-from .round import LeducholdemRound as Round
-from .game import LeducholdemGame as Game
+import importlib
 
+# The game classes are imported on first access (PEP 562), so that importing a light submodule
+# such as utils or batch_game, e.g. for log analysis, does not load rlcard
+_EXPORTS = {
+    'Dealer': ('.dealer', 'LeducholdemDealer'),
+    'Judger': ('.judger', 'LeducholdemJudger'),
+    'Player': ('.player', 'LeducholdemPlayer'),
+    'Round': ('.round', 'LeducholdemRound'),
+    'Game': ('.game', 'LeducholdemGame'),
+    'BatchGame': ('.batch_game', 'LeducholdemBatchGame'),
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module, attr = _EXPORTS[name]
+    value = getattr(importlib.import_module(module, __name__), attr)
+    globals()[name] = value
+    return value
@@ -0,0 +1,241 @@
+''' Vectorized 52-card Leduc Hold'em
+
+Plays N independent hands at once. All game state is kept as struct-of-arrays
+(one entry per game) and every call advances all unfinished games together.
+The rules, observations and payoffs match LeducholdemGame / LeducholdemEnv.
+'''
+
+import numpy as np
+
+from .utils import SHOWDOWN_WINNER, NO_PUBLIC_CARD, MAX_ENCODED_CHIPS, encode_obs_id
+
+# Action ids, same order as LeducholdemEnv.actions
+CALL, RAISE, FOLD, CHECK = 0, 1, 2, 3
+
+NO_CARD = -1
+
+
+class LeducholdemBatchGame:
+
+    def __init__(self, num_games, num_players=2):
+        ''' Initialize a batch of leducholdem games
+
+        Args:
+            num_games (int): The number of games played in lockstep
+            num_players (int): Only two-player games are supported
+        '''
+        if num_players != 2:
+            raise ValueError('LeducholdemBatchGame only supports two players')
+        self.num_games = num_games
+        self.num_players = num_players
+        self.num_actions = 4
+        self.np_random = np.random.RandomState()
+
+        # Same configuration as LeducholdemGame
+        self.small_blind = 1
+        self.big_blind = 2 * self.small_blind
+        self.raise_amount = self.big_blind
+        self.allowed_raise_num = 2
+
+        self.state_shape = [156]
+
+    def seed(self, seed=None):
+        ''' Seed the random number generator used for dealing
+        '''
+        self.np_random = np.random.RandomState(seed)
+
+    def _deal(self):
+        ''' Draw two hole cards and the public card for every game without replacement
+
+        Returns:
+            (numpy.array): (num_games, 3) card indices
+        '''
+        n = self.num_games
+        first = self.np_random.randint(0, 52, size=n)
+        second = self.np_random.randint(0, 51, size=n)
+        second += second >= first
+        third = self.np_random.randint(0, 50, size=n)
+        low = np.minimum(first, second)
+        high = np.maximum(first, second)
+        third += third >= low
+        third += third >= high
+        return np.stack([first, second, third], axis=1)
+
+    def init_game(self, hands=None, public_cards=None, small_blinds=None):
+        ''' Start a new hand in every game
+
+        Args:
+            hands (numpy.array): Optional (num_games, 2) hole card indices
+            public_cards (numpy.array): Optional (num_games,) public card indices
+            small_blinds (numpy.array): Optional (num_games,) id of the small blind player
+
+        The optional arguments fix the deal, e.g. to replay hands played by LeducholdemGame.
+
+        Returns:
+            (tuple): Tuple containing:
+
+                (numpy.array): (num_games, 156) observations of the players to act
+                (numpy.array): (num_games,) ids of the players to act
+        '''
+        n = self.num_games
+        cards = self._deal()
+        self.hands = cards[:, :2].astype(np.int8) if hands is None else np.asarray(hands, dtype=np.int8).copy()
+        self.next_public_card = cards[:, 2].astype(np.int8) if public_cards is None \
+            else np.asarray(public_cards, dtype=np.int8).copy()
+        if small_blinds is None:
+            small_blinds = self.np_random.randint(0, self.num_players, size=n)
+        small_blinds = np.asarray(small_blinds, dtype=np.int8)
+
+        rows = np.arange(n)
+        self.public_card = np.full(n, NO_CARD, dtype=np.int8)
+        self.in_chips = np.zeros((n, 2), dtype=np.int16)
+        self.in_chips[rows, small_blinds] = self.small_blind
+        self.in_chips[rows, 1 - small_blinds] = self.big_blind
+        self.raised = self.in_chips.copy()
+        self.folded = np.full(n, NO_CARD, dtype=np.int8)
+        self.have_raised = np.zeros(n, dtype=np.int8)
+        self.not_raise_num = np.zeros(n, dtype=np.int8)
+        self.round_raise_amount = np.full(n, self.raise_amount, dtype=np.int16)
+        self.round_counter = np.zeros(n, dtype=np.int8)
+        self.game_pointer = small_blinds.copy()
+
+        return self.get_obs(), self.game_pointer.copy()
+
+    def is_over(self):
+        ''' Check which games are over
+
+        Returns:
+            (numpy.array): (num_games,) boolean mask of finished games
+        '''
+        return (self.folded != NO_CARD) | (self.round_counter >= 2)
+
+    def get_legal_actions(self):
+        ''' Legal actions of the players to act
+
+        Returns:
+            (numpy.array): (num_games, 4) boolean mask indexed by action id
+        '''
+        rows = np.arange(self.num_games)
+        mine = self.raised[rows, self.game_pointer]
+        top = self.raised.max(axis=1)
+        legal = np.empty((self.num_games, self.num_actions), dtype=bool)
+        legal[:, CALL] = mine < top
+        legal[:, RAISE] = self.have_raised < self.allowed_raise_num
+        legal[:, FOLD] = True
+        legal[:, CHECK] = mine >= top
+        return legal
+
+    def step(self, actions):
+        ''' Advance every unfinished game by one action
+
+        Args:
+            actions (numpy.array): (num_games,) action ids of the players to act.
+                Entries for finished games are ignored. Illegal actions are replaced
+                by check, or fold if check is not legal, as in LeducholdemEnv.
+
+        Returns:
+            (tuple): Tuple containing:
+
+                (numpy.array): (num_games, 156) observations of the next players to act
+                (numpy.array): (num_games,) ids of the next players to act
+        '''
+        actions = np.asarray(actions)
+        active = ~self.is_over()
+        legal = self.get_legal_actions()
+        rows = np.arange(self.num_games)
+        is_legal = legal[rows, np.clip(actions, 0, self.num_actions - 1)] & (actions >= 0) & (actions < self.num_actions)
+        actions = np.where(is_legal, actions, np.where(legal[:, CHECK], CHECK, FOLD))
+
+        gp = self.game_pointer
+        top = self.raised.max(axis=1)
+
+        call = active & (actions == CALL)
+        diff = (top - self.raised[rows, gp]) * call
+        self.raised[rows, gp] += diff
+        self.in_chips[rows, gp] += diff
+
+        rise = active & (actions == RAISE)
+        diff = (top - self.raised[rows, gp] + self.round_raise_amount) * rise
+        self.raised[rows, gp] += diff
+        self.in_chips[rows, gp] += diff
+        self.have_raised += rise
+        self.not_raise_num = np.where(rise, 1, self.not_raise_num + (active & ((actions == CALL) | (actions == CHECK)))).astype(np.int8)
+
+        fold = active & (actions == FOLD)
+        self.folded = np.where(fold, gp, self.folded).astype(np.int8)
+
+        self.game_pointer = np.where(active, 1 - gp, gp).astype(np.int8)
+
+        # Finish the betting round where every player has acted without raising
+        round_over = active & ~fold & (self.not_raise_num >= self.num_players)
+        deal = round_over & (self.round_counter == 0)
+        self.public_card = np.where(deal, self.next_public_card, self.public_card)
+        self.round_raise_amount = np.where(deal, 2 * self.raise_amount, self.round_raise_amount)
+        self.round_counter += round_over
+        self.raised[round_over] = 0
+        self.have_raised[round_over] = 0
+        self.not_raise_num[round_over] = 0
+
+        return self.get_obs(), self.game_pointer.copy()
+
+    def get_obs(self, player=None):
+        ''' Encode the observations of one player in every game
+
+        Args:
+            player (int or numpy.array): Player id, or per-game player ids.
+                Defaults to the players to act.
+
+        Returns:
+            (numpy.array): (num_games, 156) observations, encoded as in LeducholdemEnv
+        '''
+        if player is None:
+            player = self.game_pointer
+        player = np.broadcast_to(np.asarray(player), (self.num_games,))
+        rows = np.arange(self.num_games)
+        obs = np.zeros((self.num_games, 156))
+        obs[rows, self.hands[rows, player]] = 1
+        has_public = self.public_card != NO_CARD
+        obs[rows[has_public], self.public_card[has_public] + 52] = 1
+        my_chips = self.in_chips[rows, player]
+        opponent_chips = self.in_chips.sum(axis=1) - my_chips
+        obs[rows, 104 + np.minimum(my_chips, MAX_ENCODED_CHIPS)] = 1
+        obs[rows, 130 + np.minimum(opponent_chips, MAX_ENCODED_CHIPS)] = 1
+        return obs
+
+    def get_obs_ids(self, player=None):
+        ''' Integer ids of the observations of one player in every game
+
+        Args:
+            player (int or numpy.array): Player id, or per-game player ids.
+                Defaults to the players to act.
+
+        Returns:
+            (numpy.array): (num_games,) ids, equal to state['obs_id'] of LeducholdemEnv
+        '''
+        if player is None:
+            player = self.game_pointer
+        player = np.broadcast_to(np.asarray(player), (self.num_games,))
+        rows = np.arange(self.num_games)
+        public = np.where(self.public_card == NO_CARD, NO_PUBLIC_CARD, self.public_card)
+        my_chips = self.in_chips[rows, player].astype(np.int64)
+        opponent_chips = self.in_chips.sum(axis=1) - my_chips
+        return encode_obs_id(self.hands[rows, player].astype(np.int64), public.astype(np.int64),
+                             np.minimum(my_chips, MAX_ENCODED_CHIPS), np.minimum(opponent_chips, MAX_ENCODED_CHIPS))
+
+    def get_payoffs(self):
+        ''' Payoffs of finished games, in big blinds
+
+        Returns:
+            (numpy.array): (num_games, 2) payoffs. Rows of unfinished games are undefined.
+        '''
+        winner = np.where(self.folded != NO_CARD, 1 - self.folded, self._showdown_winner())
+        rows = np.arange(self.num_games)
+        payoffs = -self.in_chips.astype(np.float64)
+        payoffs[rows, winner] += self.in_chips.sum(axis=1)
+        return payoffs / self.big_blind
+
+    def _showdown_winner(self):
+        ''' Winner of the showdown in every game, looked up in SHOWDOWN_WINNER
+        '''
+        public = np.where(self.public_card == NO_CARD, NO_PUBLIC_CARD, self.public_card)
+        return SHOWDOWN_WINNER[self.hands[:, 0], self.hands[:, 1], public]
@@ -1,4 +1,4 @@
-from rlcard.games.base import Card
+from .utils import CARD2INDEX, RANKS
 
 
 class LeducholdemDealer:
@@ -9,8 +9,9 @@ class LeducholdemDealer:
         self.np_random = np_random
 
         # CHANGE: Expanded from 4 ranks ['J', 'Q', 'K', 'A'] to full 13 ranks
-        self.deck = [Card(suit, rank) for suit in ['S', 'H', 'D', 'C']
-                     for rank in ['2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K', 'A']]
+        # Cards are ints 0..51 (see utils.py), listed in the same order as the original Card deck
+        # so that a seeded shuffle deals the same cards
+        self.deck = [CARD2INDEX[suit + rank] for suit in ['S', 'H', 'D', 'C'] for rank in RANKS]
 
         self.shuffle()
         self.pot = 0
@@ -23,6 +24,6 @@ class LeducholdemDealer:
         Deal one card from the deck
 
         Returns:
-            (Card): The drawn card from the deck
+            (int): The index of the drawn card
         """
         return self.deck.pop()
@@ -10,10 +10,19 @@ from rlcard.games.limitholdem import Game
 
 class LeducholdemGame(Game):
 
-    def __init__(self, allow_step_back=False, num_players=2):
+    def __init__(self, allow_step_back=False, num_players=2, step_back_mode='undo'):
         ''' Initialize the class leducholdem Game
+
+        Args:
+            allow_step_back (bool): Record history so that step_back can be used
+            num_players (int): The number of players
+            step_back_mode (str): 'undo' records only the fields an action changes,
+                'snapshot' copies the whole game state (slow, for debugging)
         '''
+        if step_back_mode not in ('undo', 'snapshot'):
+            raise ValueError('step_back_mode must be "undo" or "snapshot", got {}'.format(step_back_mode))
         self.allow_step_back = allow_step_back
+        self.step_back_mode = step_back_mode
         self.np_random = np.random.RandomState()
         ''' No big/small blind
         # Some configarations of the game
@@ -106,7 +115,28 @@ class LeducholdemGame(Game):
                 (dict): next player's state
                 (int): next plater's id
         '''
-        if self.allow_step_back:
+        self.apply_action(action)
+        state = self.get_state(self.game_pointer)
+
+        return state, self.game_pointer
+
+    def apply_action(self, action):
+        ''' Same as step, but without building the next player's state (for tree traversal)
+
+        Args:
+            action (str): a specific action. (call, raise, fold, or check)
+
+        Returns:
+            (int): next player's id
+        '''
+        if self.allow_step_back and self.step_back_mode == 'undo':
+            # Record the fields this action can change
+            actor = self.players[self.game_pointer]
+            self.history.append((self.game_pointer, self.round_counter, self.public_card,
+                                 self.round.game_pointer, self.round.raised, self.round.raised[self.game_pointer],
+                                 self.round.have_raised, self.round.not_raise_num, self.round.player_folded,
+                                 self.round.raise_amount, actor.in_chips, actor.status))
+        elif self.allow_step_back:
             # First snapshot the current state
             r = copy(self.round)
             r_raised = copy(self.round.raised)
@@ -131,9 +161,7 @@ class LeducholdemGame(Game):
             self.round_counter += 1
             self.round.start_new_round(self.game_pointer)
 
-        state = self.get_state(self.game_pointer)
-
-        return state, self.game_pointer
+        return self.game_pointer
 
     def get_state(self, player):
         ''' Return player's state
@@ -184,6 +212,21 @@ class LeducholdemGame(Game):
         Returns:
             (bool): True if the game steps back successfully
         '''
+        if len(self.history) > 0 and self.step_back_mode == 'undo':
+            (gp, self.round_counter, public_card, self.round.game_pointer, raised, raised_value,
+             self.round.have_raised, self.round.not_raise_num, self.round.player_folded,
+             self.round.raise_amount, in_chips, status) = self.history.pop()
+            # Put a public card dealt by this action back on the deck
+            if public_card is None and self.public_card is not None:
+                self.dealer.deck.append(self.public_card)
+            self.public_card = public_card
+            # A new round replaces the raised list, so restore the old list object
+            self.round.raised = raised
+            raised[gp] = raised_value
+            self.game_pointer = gp
+            self.players[gp].in_chips = in_chips
+            self.players[gp].status = status
+            return True
         if len(self.history) > 0:
             self.round, r_raised, self.game_pointer, self.round_counter, d_deck, self.public_card, self.players, ps_hand = self.history.pop()
             self.round.raised = r_raised
@@ -0,0 +1,194 @@
+''' Compact integer info-set ids for 52-card Leduc Hold'em
+
+An info set is what the 156-dim observation encodes: (hand, public card, my chips,
+opponent chips). Only a handful of chip pairs can occur at a decision, so the pair is
+replaced by a dense chip-state index and
+
+    infoset = (hand * 53 + public_card) * NUM_CHIP_STATES + chip_state
+
+with public_card = NO_PUBLIC_CARD before the flop. CFR tables keyed by these ids are
+much smaller than tables keyed by state['obs'].tobytes(). Old bytes-keyed pickles can be
+converted with convert_cfr_pickle, or from the command line:
+
+    python -m BNAIC_paper_files.custom_leduc_rlcard.infoset old.pkl new.pkl
+'''
+
+import pickle
+import sys
+
+import numpy as np
+
+from .game import LeducholdemGame
+from .utils import NUM_CARDS, NO_PUBLIC_CARD, NUM_CHIP_SLOTS, MAX_ENCODED_CHIPS
+
+
+def _reachable_chip_states():
+    ''' Walk the betting tree once and collect the (my_chips, opponent_chips) pairs of the player to act
+    '''
+    game = LeducholdemGame(allow_step_back=True)
+    game.init_game()
+    states = set()
+
+    def walk():
+        if game.is_over():
+            return
+        player = game.game_pointer
+        my_chips = game.players[player].in_chips
+        opponent_chips = sum(p.in_chips for p in game.players) - my_chips
+        states.add((min(my_chips, MAX_ENCODED_CHIPS), min(opponent_chips, MAX_ENCODED_CHIPS)))
+        for action in game.get_legal_actions():
+            game.step(action)
+            walk()
+            game.step_back()
+
+    walk()
+    return sorted(states)
+
+
+CHIP_STATES = _reachable_chip_states()
+NUM_CHIP_STATES = len(CHIP_STATES)
+
+# CHIP_STATE_INDEX[my_chips * NUM_CHIP_SLOTS + opponent_chips] is the dense chip state, -1 if unreachable
+CHIP_STATE_INDEX = np.full(NUM_CHIP_SLOTS * NUM_CHIP_SLOTS, -1, dtype=np.int64)
+for _i, (_mine, _theirs) in enumerate(CHIP_STATES):
+    CHIP_STATE_INDEX[_mine * NUM_CHIP_SLOTS + _theirs] = _i
+_CHIP_STATE_LOOKUP = CHIP_STATE_INDEX.tolist()
+
+NUM_INFOSETS = NUM_CARDS * (NUM_CARDS + 1) * NUM_CHIP_STATES
+
+CFR_TABLE_KEYS = ('policy', 'average_policy', 'regrets')
+
+
+def infoset_from_obs_id(obs_id):
+    ''' Map state['obs_id'] to the dense info-set id
+
+    Works elementwise on numpy arrays as well as on ints.
+
+    Args:
+        obs_id (int): Observation id, see utils.encode_obs_id
+
+    Returns:
+        (int): Info-set id in [0, NUM_INFOSETS), or -1 if the chip amounts cannot occur at a decision
+    '''
+    if isinstance(obs_id, int):
+        cards, chips = divmod(obs_id, NUM_CHIP_SLOTS * NUM_CHIP_SLOTS)
+        chip_state = _CHIP_STATE_LOOKUP[chips]
+        return cards * NUM_CHIP_STATES + chip_state if chip_state >= 0 else -1
+    cards, chips = np.divmod(obs_id, NUM_CHIP_SLOTS * NUM_CHIP_SLOTS)
+    chip_state = CHIP_STATE_INDEX[chips]
+    infoset = np.where(chip_state >= 0, cards * NUM_CHIP_STATES + chip_state, -1)
+    return int(infoset) if np.ndim(infoset) == 0 else infoset
+
+
+def infoset_from_game(game, player):
+    ''' Info-set id of a player in a LeducholdemGame, without building the state dict
+
+    Args:
+        game (LeducholdemGame): The game
+        player (int): The observing player
+
+    Returns:
+        (int): Info-set id, equal to infoset_from_obs_id(env.get_state(player)['obs_id'])
+    '''
+    public_card = NO_PUBLIC_CARD if game.public_card is None else game.public_card
+    my_chips = game.players[player].in_chips
+    opponent_chips = sum(p.in_chips for p in game.players) - my_chips
+    chips = min(my_chips, MAX_ENCODED_CHIPS) * NUM_CHIP_SLOTS + min(opponent_chips, MAX_ENCODED_CHIPS)
+    chip_state = _CHIP_STATE_LOOKUP[chips]
+    if chip_state < 0:
+        return -1
+    return (game.players[player].hand * (NUM_CARDS + 1) + public_card) * NUM_CHIP_STATES + chip_state
+
+
+def infoset_from_obs(obs):
+    ''' Map a 156-dim observation vector (any dtype) to the dense info-set id
+    '''
+    obs = np.asarray(obs)
+    hot = np.flatnonzero(obs)
+    hand = hot[0]
+    if len(hot) == 4:
+        public_card = hot[1] - 52
+    else:
+        public_card = NO_PUBLIC_CARD
+    my_chips = hot[-2] - 104
+    opponent_chips = hot[-1] - 130
+    cards = hand * (NUM_CARDS + 1) + public_card
+    chip_state = CHIP_STATE_INDEX[my_chips * NUM_CHIP_SLOTS + opponent_chips]
+    if chip_state < 0:
+        return -1
+    return int(cards * NUM_CHIP_STATES + chip_state)
+
+
+def decode_infoset(infoset):
+    ''' Inverse of the info-set id
+
+    Returns:
+        (tuple): (hand, public_card, my_chips, opponent_chips), public_card is NO_PUBLIC_CARD before the flop
+    '''
+    cards, chip_state = divmod(int(infoset), NUM_CHIP_STATES)
+    hand, public_card = divmod(cards, NUM_CARDS + 1)
+    my_chips, opponent_chips = CHIP_STATES[chip_state]
+    return hand, public_card, my_chips, opponent_chips
+
+
+def migrate_bytes_keyed_table(table):
+    ''' Re-key a CFR table from obs.tobytes() keys to info-set ids
+
+    Keys are decoded as float64 observations (the dtype used when the tables were written),
+    or uint8 observations if the key is 156 bytes long. Integer keys are kept as they are.
+
+    Args:
+        table (dict): Table keyed by observation bytes
+
+    Returns:
+        (dict): The same values keyed by info-set id
+    '''
+    migrated = {}
+    for key, value in table.items():
+        if isinstance(key, bytes):
+            dtype = np.uint8 if len(key) == 156 else np.float64
+            infoset = infoset_from_obs(np.frombuffer(key, dtype=dtype))
+            if infoset < 0:
+                raise ValueError('Observation key does not decode to a reachable info set')
+            key = infoset
+        migrated[key] = value
+    return migrated
+
+
+def is_bytes_keyed(data):
+    ''' True if a loaded CFR pickle still uses obs.tobytes() keys
+    '''
+    for name in CFR_TABLE_KEYS:
+        table = data.get(name)
+        if isinstance(table, dict) and any(isinstance(key, bytes) for key in table):
+            return True
+    return False
+
+
+def migrate_cfr_data(data):
+    ''' Re-key every table of a loaded CFR pickle, see migrate_bytes_keyed_table
+    '''
+    data = dict(data)
+    for name in CFR_TABLE_KEYS:
+        if isinstance(data.get(name), dict):
+            data[name] = migrate_bytes_keyed_table(data[name])
+    return data
+
+
+def convert_cfr_pickle(src_path, dst_path):
+    ''' Convert a CFR pickle keyed by obs.tobytes() into one keyed by info-set ids
+    '''
+    with open(src_path, 'rb') as f:
+        data = pickle.load(f)
+    data = migrate_cfr_data(data)
+    with open(dst_path, 'wb') as f:
+        pickle.dump(data, f)
+    return data
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        print('Usage: python -m BNAIC_paper_files.custom_leduc_rlcard.infoset <old.pkl> <new.pkl>')
+        sys.exit(1)
+    converted = convert_cfr_pickle(sys.argv[1], sys.argv[2])
+    print(f"Converted {len(converted.get('average_policy', {}))} info sets to {sys.argv[2]}")
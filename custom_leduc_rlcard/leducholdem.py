@@ -1,11 +1,9 @@
-import json
-import os
 import numpy as np
 from collections import OrderedDict
-import rlcard
 from rlcard.envs import Env
-from BNAIC_paper_files.custom_leduc_rlcard import Game
-from rlcard.utils import *
+from BNAIC_paper_files.custom_leduc_rlcard.game import LeducholdemGame as Game
+from BNAIC_paper_files.custom_leduc_rlcard.utils import INDEX2CARD, CARD2INDEX, NO_PUBLIC_CARD, MAX_ENCODED_CHIPS, \
+    encode_obs_id
 
 DEFAULT_GAME_CONFIG = {
     'game_num_players': 2,
@@ -18,10 +16,20 @@ class LeducholdemEnv(Env):
 
     def __init__(self, config):
         ''' Initialize the Limitholdem environment
+
+        Besides the rlcard options, config accepts:
+            'obs_dtype' (numpy dtype): dtype of state['obs'], default float64. np.uint8 is 8x smaller.
+            'reuse_obs_buffer' (bool): Write every observation into one preallocated buffer
+                instead of a fresh array. Only for callers that use state['obs'] before the next
+                state is extracted (tree traversal, evaluation), never for replay buffers.
+            'lean_state' (bool): Leave out 'raw_obs' and 'action_record' and share the legal
+                action list instead of copying it.
+            'step_back_mode' (str): See LeducholdemGame
         '''
         self.name = 'custom-leduc-holdem'
         self.default_game_config = DEFAULT_GAME_CONFIG
-        self.game = Game()
+        # 'snapshot' keeps the old copy-everything step_back, useful to check the undo log against
+        self.game = Game(step_back_mode=config.get('step_back_mode', 'undo'))
         super().__init__(config)
         self.actions = ['call', 'raise', 'fold', 'check']
 
@@ -32,9 +40,14 @@ class LeducholdemEnv(Env):
 
         self.action_shape = [None for _ in range(self.num_players)]
 
-        card_path = os.path.join(os.path.dirname(__file__), 'card2index.json')
-        with open(card_path, 'r') as file:
-            self.card2index = json.load(file)
+        # Same layout as card2index.json, built once per process in utils
+        self.card2index = CARD2INDEX
+
+        self.obs_dtype = np.dtype(config.get('obs_dtype', np.float64))
+        self.reuse_obs_buffer = config.get('reuse_obs_buffer', False)
+        self.lean_state = config.get('lean_state', False)
+        self.obs_buffer = np.zeros(156, dtype=self.obs_dtype)
+        self.action_index = {a: i for i, a in enumerate(self.actions)}
 
     def _get_legal_actions(self):
         ''' Get all leagal actions - UNCHANGED
@@ -55,34 +68,46 @@ class LeducholdemEnv(Env):
         '''
         extracted_state = {}
 
-        legal_actions = OrderedDict({self.actions.index(a): None for a in state['legal_actions']})
+        legal_actions = OrderedDict({self.action_index[a]: None for a in state['legal_actions']})
         extracted_state['legal_actions'] = legal_actions
 
         public_card = state['public_card']
         hand = state['hand']
 
         # CHANGE: Expanded observation vector from 36 to 156
-        obs = np.zeros(156)
+        if self.reuse_obs_buffer:
+            obs = self.obs_buffer
+            obs.fill(0)
+        else:
+            obs = np.zeros(156, dtype=self.obs_dtype)
 
         # CHANGE: Hand encoding now uses 52 positions instead of 16
-        obs[self.card2index[hand]] = 1
+        hand_index = self.card2index[hand]
+        obs[hand_index] = 1
 
         # CHANGE: Public card encoding uses positions 52-103 instead of 16-19
+        public_index = NO_PUBLIC_CARD
         if public_card:
-            obs[self.card2index[public_card] + 52] = 1  # Offset by 52
+            public_index = self.card2index[public_card]
+            obs[public_index + 52] = 1  # Offset by 52
 
         # CHANGE: Chip encoding uses positions 104-155 instead of 22-35
         # Keep same logic but with more positions available
-        my_chips = min(state['my_chips'], 25)  # Cap for encoding
-        total_opponent_chips = min(sum(state['all_chips']) - state['my_chips'], 25)
+        my_chips = min(state['my_chips'], MAX_ENCODED_CHIPS)  # Cap for encoding
+        total_opponent_chips = min(sum(state['all_chips']) - state['my_chips'], MAX_ENCODED_CHIPS)
 
         obs[104 + my_chips] = 1  # My chips (positions 104-129)
         obs[130 + total_opponent_chips] = 1  # Opponent chips (positions 130-155)
 
         extracted_state['obs'] = obs
-        extracted_state['raw_obs'] = state
-        extracted_state['raw_legal_actions'] = [a for a in state['legal_actions']]
-        extracted_state['action_record'] = self.action_recorder
+        # Integer that identifies the observation, e.g. for table lookups
+        extracted_state['obs_id'] = encode_obs_id(hand_index, public_index, my_chips, total_opponent_chips)
+        if self.lean_state:
+            extracted_state['raw_legal_actions'] = state['legal_actions']
+        else:
+            extracted_state['raw_obs'] = state
+            extracted_state['raw_legal_actions'] = [a for a in state['legal_actions']]
+            extracted_state['action_record'] = self.action_recorder
 
         return extracted_state
 
@@ -119,8 +144,8 @@ class LeducholdemEnv(Env):
         '''
         state = {}
         state['chips'] = [self.game.players[i].in_chips for i in range(self.num_players)]
-        state['public_card'] = self.game.public_card.get_index() if self.game.public_card else None
-        state['hand_cards'] = [self.game.players[i].hand.get_index() for i in range(self.num_players)]
+        state['public_card'] = INDEX2CARD[self.game.public_card] if self.game.public_card is not None else None
+        state['hand_cards'] = [INDEX2CARD[self.game.players[i].hand] for i in range(self.num_players)]
         state['current_round'] = self.game.round_counter
         state['current_player'] = self.game.game_pointer
         state['legal_actions'] = self.game.get_legal_actions()
@@ -1,3 +1,6 @@
+from .utils import INDEX2CARD
+
+
 class LeducholdemPlayer:
 
     def __init__(self, player_id, np_random):
@@ -18,15 +21,15 @@ class LeducholdemPlayer:
         ''' Encode the state for the player
 
         Args:
-            public_card (object): The public card that seen by all the players
+            public_card (int): The public card that seen by all the players
             all_chips (int): The chips that all players have put in
 
         Returns:
             (dict): The state of the player
         '''
         state = {}
-        state['hand'] = self.hand.get_index()
-        state['public_card'] = public_card.get_index() if public_card else None
+        state['hand'] = INDEX2CARD[self.hand]
+        state['public_card'] = INDEX2CARD[public_card] if public_card is not None else None
         state['all_chips'] = all_chips
         state['my_chips'] = self.in_chips
         state['legal_actions'] = legal_actions
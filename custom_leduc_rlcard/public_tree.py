@@ -0,0 +1,140 @@
+''' Public betting tree of 52-card Leduc Hold'em
+
+The betting in Leduc does not depend on the cards, so every hand with the same
+small blind seat follows the same tree of public states. Each node records the
+chips, the player to act and the legal actions; the cards are left to the caller,
+which can then evaluate all private-card combinations of a node at once (see
+vectorized_cfr.py). The tree is built by walking a LeducholdemGame, so it follows
+the game rules exactly.
+'''
+
+import numpy as np
+
+from .game import LeducholdemGame
+from .batch_game import CALL, RAISE, FOLD, CHECK
+from .infoset import CHIP_STATE_INDEX
+from .utils import NUM_CARDS, NUM_CHIP_SLOTS, MAX_ENCODED_CHIPS
+
+ACTION_INDEX = {'call': CALL, 'raise': RAISE, 'fold': FOLD, 'check': CHECK}
+
+
+class PublicNode:
+
+    def __init__(self, round_counter, player, in_chips, folded, legal_actions):
+        ''' Initialize a public node
+
+        Args:
+            round_counter (int): 0 before the public card, 1 after it
+            player (int): Player to act, -1 at terminal nodes
+            in_chips (tuple): Chips put in by each player
+            folded (int): Player that folded, -1 if nobody did
+            legal_actions (list): Legal action strings, empty at terminal nodes
+        '''
+        self.round_counter = round_counter
+        self.player = player
+        self.in_chips = in_chips
+        self.folded = folded
+        self.legal_actions = legal_actions
+        self.action_ids = [ACTION_INDEX[a] for a in legal_actions]
+        self.children = []
+
+    def is_terminal(self):
+        return self.player < 0
+
+    def chip_state(self, player):
+        ''' Dense chip state of a player, as used in the info-set ids
+        '''
+        my_chips = self.in_chips[player]
+        opponent_chips = sum(self.in_chips) - my_chips
+        chips = min(my_chips, MAX_ENCODED_CHIPS) * NUM_CHIP_SLOTS + min(opponent_chips, MAX_ENCODED_CHIPS)
+        return int(CHIP_STATE_INDEX[chips])
+
+    def observations(self, player, hands, public_cards=None):
+        ''' Observations of a player at this node for many private cards at once
+
+        Args:
+            player (int): The observing player
+            hands (numpy.array): Hand card of each observation
+            public_cards (numpy.array): Public card of each observation, None before the flop
+
+        Returns:
+            (numpy.array): (len(hands), 156) float32 observations, encoded as in LeducholdemEnv
+        '''
+        hands = np.asarray(hands)
+        rows = np.arange(len(hands))
+        obs = np.zeros((len(hands), 156), dtype=np.float32)
+        obs[rows, hands] = 1
+        if public_cards is not None:
+            obs[rows, NUM_CARDS + np.asarray(public_cards)] = 1
+        my_chips = self.in_chips[player]
+        opponent_chips = sum(self.in_chips) - my_chips
+        obs[:, 104 + min(my_chips, MAX_ENCODED_CHIPS)] = 1
+        obs[:, 130 + min(opponent_chips, MAX_ENCODED_CHIPS)] = 1
+        return obs
+
+    def payoffs(self, winner):
+        ''' Payoffs in big blinds if winner takes the pot
+        '''
+        pot = sum(self.in_chips)
+        return np.array([(pot if i == winner else 0) - chips for i, chips in enumerate(self.in_chips)]) / 2
+
+
+def chance_weights():
+    ''' Probabilities of the other cards given one hand
+
+    Returns:
+        (numpy.array): W[c, o, p], probability of opponent hand o and public card p given hand c
+    '''
+    cards = np.arange(NUM_CARDS)
+    distinct = ((cards[:, None, None] != cards[None, :, None])
+                & (cards[:, None, None] != cards[None, None, :])
+                & (cards[None, :, None] != cards[None, None, :]))
+    return distinct / ((NUM_CARDS - 1) * (NUM_CARDS - 2))
+
+
+def _init_game(small_blind):
+    game = LeducholdemGame(allow_step_back=True)
+    game.init_game()
+    # Seat the blinds as requested, same as the end of init_game
+    big_blind = (small_blind + 1) % game.num_players
+    game.players[small_blind].in_chips = game.small_blind
+    game.players[big_blind].in_chips = game.big_blind
+    game.game_pointer = small_blind
+    game.round.start_new_round(game_pointer=small_blind, raised=[p.in_chips for p in game.players])
+    return game
+
+
+def build_public_tree(small_blind):
+    ''' Build the public tree of the hands where a given seat posts the small blind
+
+    Args:
+        small_blind (int): Seat of the small blind, who acts first
+
+    Returns:
+        (PublicNode): The root node
+    '''
+    game = _init_game(small_blind)
+
+    def walk():
+        in_chips = tuple(p.in_chips for p in game.players)
+        folded = [i for i, p in enumerate(game.players) if p.status == 'folded']
+        if game.is_over():
+            return PublicNode(game.round_counter, -1, in_chips, folded[0] if folded else -1, [])
+        node = PublicNode(game.round_counter, game.game_pointer, in_chips, -1, game.get_legal_actions())
+        for action in node.legal_actions:
+            game.apply_action(action)
+            node.children.append(walk())
+            game.step_back()
+        return node
+
+    return walk()
+
+
+def iter_nodes(root):
+    ''' All nodes of a public tree, parents before children
+    '''
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed(node.children))
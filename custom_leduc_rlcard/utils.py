@@ -0,0 +1,87 @@
+''' Integer card encoding and showdown tables for 52-card Leduc Hold'em
+
+Cards are ints 0..51 laid out as in card2index.json: index = rank * 4 + suit,
+with ranks ordered 2..A and suits ordered S, H, D, C. String names such as 'SA'
+are only produced at the edges (player states, logs).
+'''
+
+import numpy as np
+
+RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K', 'A']
+SUITS = ['S', 'H', 'D', 'C']
+
+# Full 13 ranks
+RANK_ORDER = {rank: i for i, rank in enumerate(RANKS)}
+# Suit ordering - HIGHER SUIT WINS
+SUIT_ORDER = {'C': 0, 'D': 1, 'H': 2, 'S': 3}
+
+INDEX2CARD = [suit + rank for rank in RANKS for suit in SUITS]
+CARD2INDEX = {card: i for i, card in enumerate(INDEX2CARD)}
+
+NUM_CARDS = len(INDEX2CARD)
+
+# Public card slot used in the tables when no public card has been dealt
+NO_PUBLIC_CARD = NUM_CARDS
+
+
+def card_rank(card):
+    ''' Rank of a card, 0 for '2' up to 12 for 'A'
+    '''
+    return card // 4
+
+
+def _build_hand_scores():
+    scores = np.empty(NUM_CARDS, dtype=np.int16)
+    for i, card in enumerate(INDEX2CARD):
+        scores[i] = RANK_ORDER[card[1]] * 4 + SUIT_ORDER[card[0]]
+    return scores
+
+
+def _build_showdown_strength():
+    strength = np.empty((NUM_CARDS, NUM_CARDS + 1), dtype=np.int16)
+    strength[:] = HAND_SCORES[:, None]
+    ranks = np.arange(NUM_CARDS) // 4
+    # Pairs always beat high cards
+    strength[:, :NUM_CARDS] += 1000 * (ranks[:, None] == ranks[None, :])
+    return strength
+
+
+def _build_showdown_winner():
+    winner = (SHOWDOWN_STRENGTH[None, :, :] > SHOWDOWN_STRENGTH[:, None, :]).astype(np.int8)
+    winner[np.arange(NUM_CARDS), np.arange(NUM_CARDS), :] = -1
+    return winner
+
+
+# Score of a single card: rank first, suit breaks ties
+HAND_SCORES = _build_hand_scores()
+
+# SHOWDOWN_STRENGTH[hand, public] orders hands at showdown, public may be NO_PUBLIC_CARD
+SHOWDOWN_STRENGTH = _build_showdown_strength()
+
+# SHOWDOWN_WINNER[hand_0, hand_1, public] is the seat (0 or 1) that wins the showdown,
+# -1 where both players would hold the same card
+SHOWDOWN_WINNER = _build_showdown_winner()
+
+# Chips are one-hot encoded in 26 slots (0..25) per player, larger amounts are capped
+MAX_ENCODED_CHIPS = 25
+NUM_CHIP_SLOTS = MAX_ENCODED_CHIPS + 1
+
+# Number of distinct observation ids, see encode_obs_id
+NUM_OBS_IDS = NUM_CARDS * (NUM_CARDS + 1) * NUM_CHIP_SLOTS * NUM_CHIP_SLOTS
+
+
+def encode_obs_id(hand, public_card, my_chips, opponent_chips):
+    ''' Pack the four one-hot slots of a 156-dim observation into one integer
+
+    Works elementwise on numpy arrays as well as on ints.
+
+    Args:
+        hand (int): Hand card index
+        public_card (int): Public card index, NO_PUBLIC_CARD if not dealt yet
+        my_chips (int): Chips put in by the observing player, capped at MAX_ENCODED_CHIPS
+        opponent_chips (int): Chips put in by the opponents, capped at MAX_ENCODED_CHIPS
+
+    Returns:
+        (int): An id in [0, NUM_OBS_IDS) that maps one-to-one to the observation vector
+    '''
+    return ((hand * (NUM_CARDS + 1) + public_card) * NUM_CHIP_SLOTS + my_chips) * NUM_CHIP_SLOTS + opponent_chips
@@ -0,0 +1,148 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from BNAIC_paper_files.custom_leduc_rlcard.infoset import infoset_from_game
+
+
+class DQNOpponentCache:
+    """
+    Greedy DQN opponent for CFR tree traversal, memoized by info set.
+
+    Actions match DQNAgent.eval_step (argmax of the Q-values over legal actions) and are cached
+    per (info set, legal actions). The cache is tagged with the network version, dqn_agent.train_t,
+    and is emptied as soon as a training update changes the weights. Call invalidate() after
+    changing the weights any other way (e.g. loading a checkpoint).
+
+    Lookups can also be batched: during a discovery walk, query() returns the cached action or
+    queues the observation, and flush() evaluates everything queued in one forward pass. Wrap a
+    batched traversal in begin_batch() / end_batch(): entries are not evicted in between, so the
+    actions flushed for the traversal stay available even when they outnumber max_size.
+
+    hits and misses count the lookups of action() only, one miss per network evaluation of a key
+    (batched or not), so the hit rate is the share of opponent decisions that needed no forward
+    pass. forward_passes counts the network calls themselves.
+    """
+
+    def __init__(self, dqn_agent, num_actions=4, max_size=None):
+        self.agent = dqn_agent
+        self.num_actions = num_actions
+        # Least recently used entries are evicted beyond max_size, None means unbounded
+        self.max_size = max_size
+        self.actions = OrderedDict()
+        self.pending = {}
+        self.version = dqn_agent.train_t
+        # Inside begin_batch() / end_batch(): eviction is deferred, and keys flushed but not yet
+        # looked up by action() are counted as misses there
+        self.batching = False
+        self.flushed = set()
+
+        self.hits = 0
+        self.misses = 0
+        self.forward_passes = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(env, player):
+        """Opponent info set plus its legal actions"""
+        game = env.game
+        legal_mask = 0
+        for a in game.get_legal_actions():
+            legal_mask |= 1 << env.action_index[a]
+        return infoset_from_game(game, player), legal_mask
+
+    def _check_version(self):
+        if self.agent.train_t != self.version:
+            self.invalidate()
+
+    def _lookup(self, key):
+        action = self.actions.get(key)
+        if action is not None:
+            self.actions.move_to_end(key)
+        return action
+
+    def _evict(self):
+        if self.max_size is not None:
+            while len(self.actions) > self.max_size:
+                self.actions.popitem(last=False)
+
+    def _store(self, keys, q_values):
+        legal = np.array([[(mask >> a) & 1 for a in range(self.num_actions)] for _, mask in keys], dtype=bool)
+        best_actions = np.argmax(np.where(legal, q_values, -np.inf), axis=1)
+        for key, action in zip(keys, best_actions):
+            self.actions[key] = int(action)
+            self.actions.move_to_end(key)
+        if not self.batching:
+            self._evict()
+        self.forward_passes += 1
+        return best_actions
+
+    def query(self, env, player):
+        """Cached action of the player to act, or None after queueing its observation"""
+        self._check_version()
+        key = self.key(env, player)
+        action = self._lookup(key)
+        if action is None and key not in self.pending:
+            self.pending[key] = np.array(env.get_state(player)['obs'], dtype=np.float32)
+        return action
+
+    def action(self, env, player):
+        """Greedy action of the player to act, running the network on a cache miss"""
+        self._check_version()
+        key = self.key(env, player)
+        action = self._lookup(key)
+        if action is None:
+            self.misses += 1
+            obs = np.array(env.get_state(player)['obs'], dtype=np.float32)[None]
+            action = int(self._store([key], self.agent.q_estimator.predict_nograd(obs))[0])
+        elif key in self.flushed:
+            # First use of an action evaluated by flush() during this batch
+            self.misses += 1
+            self.flushed.discard(key)
+        else:
+            self.hits += 1
+        return action
+
+    def flush(self):
+        """Evaluate every queued observation in one forward pass"""
+        self._check_version()
+        if not self.pending:
+            return
+        keys = list(self.pending.keys())
+        obs = np.stack([self.pending[key] for key in keys])
+        self._store(keys, self.agent.q_estimator.predict_nograd(obs))
+        if self.batching:
+            self.flushed.update(keys)
+        self.pending.clear()
+
+    def begin_batch(self):
+        """Start a batched traversal: keep every entry until end_batch()"""
+        self.batching = True
+
+    def end_batch(self):
+        """End a batched traversal and evict down to max_size"""
+        self.batching = False
+        self.flushed.clear()
+        self._evict()
+
+    def invalidate(self):
+        """Forget cached actions and start a new network version"""
+        self.actions.clear()
+        self.pending.clear()
+        self.flushed.clear()
+        self.version = self.agent.train_t
+        self.invalidations += 1
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {
+            'opponent_cache_hits': self.hits,
+            'opponent_cache_misses': self.misses,
+            'opponent_cache_hit_rate': self.hit_rate(),
+            'opponent_cache_size': len(self.actions),
+            'opponent_forward_passes': self.forward_passes,
+            'opponent_cache_invalidations': self.invalidations,
+        }
@@ -1,14 +1,20 @@
 import os
-import json
 import pickle
-import torch
+import shutil
+import multiprocessing as mp
 import numpy as np
-from rlcard.agents import DQNAgent
 from rlcard.utils import set_seed
 from rlcard.envs.registration import register
 
 # Import custom environment
 from BNAIC_paper_files.custom_leduc_rlcard.leducholdem import LeducholdemEnv
+from BNAIC_paper_files.custom_leduc_rlcard.batch_game import LeducholdemBatchGame, CHECK, NO_CARD
+from BNAIC_paper_files.custom_leduc_rlcard.infoset import infoset_from_obs_id
+from BNAIC_paper_files.custom_leduc_rlcard.utils import INDEX2CARD
+from BNAIC_paper_files.cfr_tables import DenseCFRTables
+from BNAIC_paper_files.game_log import GameLog, GameLogWriter, GAME_DTYPE, STEP_DTYPE, legal_mask, merge_game_logs, \
+    export_jsonl
+from BNAIC_paper_files.online_bluff_analytics import OnlineBluffAnalytics
 
 # Register the custom environment
 register(env_id="custom-leduc-holdem",
@@ -16,9 +22,21 @@ register(env_id="custom-leduc-holdem",
 
 NUM_GAMES = 100_000
 SEED = 42
+# >1 splits the games into one shard per worker process, see evaluate_sharded
+NUM_WORKERS = 1
+# >0 plays that many games in lockstep with batched DQN and CFR decisions, see play_games_lockstep
+LOCKSTEP_BATCH_SIZE = 0
 SAVE_DIR = r'C:\Users\zaket\PycharmProjects\Thesis\BNAIC_paper_results\simultaneous_Evaluation_100K'
 CFR_MODEL_PATH = r"C:\Users\zaket\PycharmProjects\Thesis\BNAIC_paper_results\simultaneous_Training_100K\cfr_simultaneous_100K.pkl"
 DQN_MODEL_PATH = r"C:\Users\zaket\PycharmProjects\Thesis\BNAIC_paper_results\simultaneous_Training_100K\dqn_simultaneous_100K.pt"
+# Write the binary game log (see game_log.py), one record per hand
+WRITE_GAME_LOG = True
+# Update the threshold and statistical bluff statistics while playing and print them at the end
+# (see online_bluff_analytics.py), without re-reading the game log
+ONLINE_ANALYTICS = True
+LOG_PATH = os.path.join(SAVE_DIR, 'evaluation_game_log_100K')
+# Also export the old JSONL logs; the analysis scripts read the binary log directly
+EXPORT_JSONL = False
 LOG_ALL_PATH = os.path.join(SAVE_DIR, 'evaluation_game_logs_all_100K.jsonl')
 LOG_CFR_PATH = os.path.join(SAVE_DIR, 'evaluation_game_logs_cfr_pov_100K.jsonl')
 LOG_DQN_PATH = os.path.join(SAVE_DIR, 'evaluation_game_logs_dqn_pov_100K.jsonl')
@@ -34,15 +52,11 @@ class CFRWrapper:
         self.use_raw = False
 
     def step(self, state):
-        obs = state['obs'].tobytes()
+        infoset = infoset_from_obs_id(state['obs_id'])
         legal_actions = list(state['legal_actions'].keys())
 
-        if obs not in self.average_policy:
-            # Uniform random for unseen states
-            action_probs = np.ones(self.env.num_actions) / self.env.num_actions
-        else:
-            # Get stored probabilities
-            action_probs = self.average_policy[obs].copy()
+        # Get stored probabilities, unseen states have an all-zero row and fall back to uniform below
+        action_probs = self.average_policy[infoset].copy()
 
         # Remove illegal actions
         for a in range(self.env.num_actions):
@@ -67,6 +81,16 @@ class CFRWrapper:
         action = self.step(state)
         return action, {"probs": {}}
 
+    def step_batch(self, obs_ids, legal, rng):
+        """Sample actions for many states at once from their observation ids and (n, 4) legal masks"""
+        action_probs = self.average_policy[infoset_from_obs_id(obs_ids)] * legal
+        total = action_probs.sum(axis=1, keepdims=True)
+        uniform = legal / legal.sum(axis=1, keepdims=True)
+        action_probs = np.where(total > 0, action_probs / np.where(total > 0, total, 1), uniform)
+        cumulative = np.cumsum(action_probs, axis=1)
+        samples = rng.random_sample(len(action_probs)) * cumulative[:, -1]
+        return np.minimum((samples[:, None] >= cumulative).sum(axis=1), self.env.num_actions - 1)
+
 
 def convert_ndarrays(obj):
     """Convert numpy arrays to lists for JSON serialization"""
@@ -95,9 +119,10 @@ def load_agents(env):
     with open(CFR_MODEL_PATH, 'rb') as f:
         cfr_data = pickle.load(f)
 
-    # Extract average policy
-    average_policy = cfr_data['average_policy']
-    print(f"CFR loaded with {len(average_policy)} states in policy")
+    # Extract average policy (older dict-keyed models are converted to the dense layout)
+    tables = DenseCFRTables.from_data(cfr_data)
+    average_policy = tables.average_policy
+    print(f"CFR loaded with {tables.num_visited()} states in policy")
 
     # Create CFR wrapper
     cfr_agent = CFRWrapper(average_policy, env)
@@ -106,6 +131,10 @@ def load_agents(env):
     if not os.path.exists(DQN_MODEL_PATH):
         raise FileNotFoundError(f"DQN model not found at {DQN_MODEL_PATH}")
 
+    # torch is only imported once a DQN is loaded, not by the parent process of a sharded run
+    import torch
+    from rlcard.agents import DQNAgent
+
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
     dqn_agent = DQNAgent(
         num_actions=env.num_actions,
@@ -124,133 +153,321 @@ def load_agents(env):
     return dqn_agent, cfr_agent
 
 
-def evaluate():
-
-    set_seed(SEED)
-
-    os.makedirs(SAVE_DIR, exist_ok=True)
+def shard_log_path(path, shard):
+    """Log segment of one shard, e.g. evaluation_game_log_100K.shard03"""
+    root, ext = os.path.splitext(path)
+    return f"{root}.shard{shard:02d}{ext}"
 
-    # Create custom environment
-    env = LeducholdemEnv(config={'seed': SEED, 'allow_step_back': False})
-    env.reset()
 
-    print("=" * 70)
-    print(f"Using environment: {env.name}")
-    print(f"Judger module: {env.game.judger.__class__.__module__}")
-    print(f"Has RANK_ORDER: {hasattr(env.game.judger, 'RANK_ORDER')}")
-    print("=" * 70)
+def play_games(env, dqn_agent, cfr_agent, first_game, num_games, log_writer, progress_every=10000, analytics=None):
+    """
+    Play num_games games numbered from first_game and record them in a binary game log.
 
-    # Load agents
-    dqn_agent, cfr_agent = load_agents(env)
-    env.set_agents([dqn_agent, cfr_agent])
+    Args:
+        log_writer (GameLogWriter): Receives one record per hand, None to skip logging
+        analytics (OnlineBluffAnalytics): Also receives one record per hand, None to skip it
 
-    # Statistics tracking
+    Returns:
+        (dict): Win counts, payoff sums and sums of squares, and the hands seen
+    """
     wins = [0, 0, 0]  # [DQN wins, CFR wins, Draws]
     total_payoffs = [0.0, 0.0]
+    total_squared_payoffs = [0.0, 0.0]
 
     unique_hands = set()
 
-    print(f"\nStarting evaluation of {NUM_GAMES} games...")
+    for game_num in range(first_game, first_game + num_games):
+        env.reset()
+        steps = []
 
-    # Open log files
-    with open(LOG_ALL_PATH, 'w') as all_f, \
-            open(LOG_CFR_PATH, 'w') as cfr_f, \
-            open(LOG_DQN_PATH, 'w') as dqn_f:
-
-        for game_num in range(1, NUM_GAMES + 1):
-            env.reset()
-            logs = []
-
-            # Play one game
-            while not env.is_over():
-                player_id = env.get_player_id()
-                state = env.get_state(player_id)
-
-                # Get action from appropriate agent
-                if player_id == 0:
-                    action, _ = dqn_agent.eval_step(state)
-                else:
-                    action, _ = cfr_agent.eval_step(state)
-
-                # Log game state
-                raw = state.get('raw_obs', {})
-
-                hand = raw.get("hand")
-                if hand:
-                    unique_hands.add(hand)
-
-                logs.append({
-                    "player_id": player_id,
-                    "hand": hand,
-                    "public_card": raw.get("public_card"),
-                    "legal_actions": raw.get("legal_actions"),
-                    "action_record": raw.get("action_record"),
-                    "action_taken": int(action),
-                })
-
-                env.step(action)
-
-            # Get game results
-            payoffs = env.get_payoffs()
-
-            # Update statistics
-            total_payoffs[0] += payoffs[0]
-            total_payoffs[1] += payoffs[1]
-
-            if payoffs[0] > payoffs[1]:
-                wins[0] += 1
-            elif payoffs[1] > payoffs[0]:
-                wins[1] += 1
+        # Play one game
+        while not env.is_over():
+            player_id = env.get_player_id()
+            state = env.get_state(player_id)
+
+            # Get action from appropriate agent
+            if player_id == 0:
+                action, _ = dqn_agent.eval_step(state)
             else:
-                wins[2] += 1
-
-            # Prepare results for logging
-            full_result = {
-                "game": game_num,
-                "log": convert_ndarrays(logs),
-                "payoffs": convert_ndarrays(payoffs),
-            }
-
-            cfr_result = {
-                "game": game_num,
-                "log": convert_ndarrays([log for log in logs if log["player_id"] == 1]),
-                "payoffs": convert_ndarrays(payoffs),
-            }
-
-            dqn_result = {
-                "game": game_num,
-                "log": convert_ndarrays([log for log in logs if log["player_id"] == 0]),
-                "payoffs": convert_ndarrays(payoffs),
-            }
-
-            # Write to files
-            all_f.write(json.dumps(full_result) + '\n')
-            cfr_f.write(json.dumps(cfr_result) + '\n')
-            dqn_f.write(json.dumps(dqn_result) + '\n')
-
-            if game_num % 10000 == 0:
-                dqn_wr = wins[0] / game_num
-                cfr_wr = wins[1] / game_num
-                draw_rate = wins[2] / game_num
-                print(
-                    f"[{game_num}/{NUM_GAMES}] DQN: {dqn_wr:.3f}, CFR: {cfr_wr:.3f}, Draws: {draw_rate:.3f}, Unique hands: {len(unique_hands)}")
+                action, _ = cfr_agent.eval_step(state)
+
+            # Log the decision: (player, action, legal actions, round)
+            unique_hands.add(INDEX2CARD[env.game.players[player_id].hand])
+            steps.append((player_id, int(action), legal_mask(state['legal_actions']),
+                          int(env.game.public_card is not None)))
+
+            env.step(action)
+
+        # Get game results
+        payoffs = env.get_payoffs()
+
+        # Update statistics
+        for i in range(2):
+            total_payoffs[i] += payoffs[i]
+            total_squared_payoffs[i] += payoffs[i] ** 2
+
+        if payoffs[0] > payoffs[1]:
+            wins[0] += 1
+        elif payoffs[1] > payoffs[0]:
+            wins[1] += 1
+        else:
+            wins[2] += 1
+
+        public_card = env.game.public_card
+        for sink in (log_writer, analytics):
+            if sink is not None:
+                sink.add_game(game_num, [p.hand for p in env.game.players],
+                              NO_CARD if public_card is None else public_card, payoffs, steps)
+
+        played = game_num - first_game + 1
+        if progress_every and played % progress_every == 0:
+            dqn_wr = wins[0] / played
+            cfr_wr = wins[1] / played
+            draw_rate = wins[2] / played
+            print(
+                f"[{game_num}/{NUM_GAMES}] DQN: {dqn_wr:.3f}, CFR: {cfr_wr:.3f}, Draws: {draw_rate:.3f}, Unique hands: {len(unique_hands)}")
+
+    return {
+        "games": num_games,
+        "wins": wins,
+        "total_payoffs": total_payoffs,
+        "total_squared_payoffs": total_squared_payoffs,
+        "unique_hands": unique_hands,
+    }
+
+
+def dqn_greedy_actions(dqn_agent, obs, legal):
+    """Greedy DQN actions for a batch of observations in one forward pass, same as eval_step"""
+    import torch
+
+    qnet = dqn_agent.q_estimator.qnet
+    with torch.inference_mode():
+        q_values = qnet(torch.as_tensor(obs, dtype=torch.float32, device=dqn_agent.device)).cpu().numpy()
+    return np.argmax(np.where(legal, q_values, -np.inf), axis=1)
+
+
+def play_games_lockstep(dqn_agent, cfr_agent, first_game, num_games, log_writer, batch_size, seed,
+                        progress_every=10000, analytics=None):
+    """
+    Same as play_games, but batch_size games are played in lockstep on a LeducholdemBatchGame.
+    Each step runs one DQN forward pass for all games where the DQN is to act, and samples the
+    CFR actions of the other games from the average policy rows in one go. Deals come from the
+    batch game's own RNG, so they differ from the per-game loop with the same seed.
+
+    Args:
+        log_writer (GameLogWriter): Receives the records of every batch, None to skip logging
+        analytics (OnlineBluffAnalytics): Also receives the records of every batch, None to skip it
+
+    Returns:
+        (dict): Same statistics as play_games
+    """
+    wins = [0, 0, 0]  # [DQN wins, CFR wins, Draws]
+    total_payoffs = [0.0, 0.0]
+    total_squared_payoffs = [0.0, 0.0]
+    unique_hands = set()
+
+    rng = np.random.RandomState(seed)
+    record = log_writer is not None or analytics is not None
+    played = 0
+    while played < num_games:
+        n = min(batch_size, num_games - played)
+        game = LeducholdemBatchGame(n)
+        game.np_random = rng
+        game.init_game()
+        # Step records of the batch and the game row of each
+        step_records, step_rows = [], []
+
+        # Play all games of the batch
+        over = game.is_over()
+        while not over.all():
+            legal = game.get_legal_actions()
+            player = game.game_pointer
+            actions = np.full(n, CHECK)
+            dqn_rows = np.flatnonzero(~over & (player == 0))
+            cfr_rows = np.flatnonzero(~over & (player == 1))
+            if len(dqn_rows):
+                actions[dqn_rows] = dqn_greedy_actions(dqn_agent, game.get_obs(0)[dqn_rows], legal[dqn_rows])
+            if len(cfr_rows):
+                actions[cfr_rows] = cfr_agent.step_batch(game.get_obs_ids(1)[cfr_rows], legal[cfr_rows], rng)
+
+            active = np.flatnonzero(~over)
+            unique_hands.update(INDEX2CARD[card] for card in np.unique(game.hands[active, player[active]]))
+            if record:
+                records = np.zeros(len(active), dtype=STEP_DTYPE)
+                records['player'] = player[active]
+                records['action'] = actions[active]
+                records['legal_mask'] = legal[active] @ (1 << np.arange(legal.shape[1]))
+                records['round'] = game.public_card[active] != NO_CARD
+                step_records.append(records)
+                step_rows.append(active)
+
+            game.step(actions)
+            over = game.is_over()
+
+        # Get game results
+        payoffs = game.get_payoffs()
+        for i in range(2):
+            total_payoffs[i] += float(payoffs[:, i].sum())
+            total_squared_payoffs[i] += float((payoffs[:, i] ** 2).sum())
+        wins[0] += int(np.sum(payoffs[:, 0] > payoffs[:, 1]))
+        wins[1] += int(np.sum(payoffs[:, 1] > payoffs[:, 0]))
+        wins[2] += int(np.sum(payoffs[:, 0] == payoffs[:, 1]))
+
+        if record:
+            # Group the steps by game, keeping their order within each game
+            rows = np.concatenate(step_rows)
+            order = np.argsort(rows, kind='stable')
+            num_steps = np.bincount(rows, minlength=n)
+            games = np.zeros(n, dtype=GAME_DTYPE)
+            games['game'] = first_game + played + np.arange(n)
+            games['hands'] = game.hands
+            games['public_card'] = game.public_card
+            games['payoffs'] = payoffs
+            games['step_start'] = np.cumsum(num_steps) - num_steps
+            games['num_steps'] = num_steps
+            steps = np.concatenate(step_records)[order]
+            for sink in (log_writer, analytics):
+                if sink is not None:
+                    sink.add_games(games, steps)
+
+        previous = played
+        played += n
+        if progress_every and played // progress_every > previous // progress_every:
+            print(f"[{first_game + played - 1}/{NUM_GAMES}] DQN: {wins[0] / played:.3f}, CFR: {wins[1] / played:.3f}, "
+                  f"Draws: {wins[2] / played:.3f}, Unique hands: {len(unique_hands)}")
+
+    return {
+        "games": num_games,
+        "wins": wins,
+        "total_payoffs": total_payoffs,
+        "total_squared_payoffs": total_squared_payoffs,
+        "unique_hands": unique_hands,
+    }
+
+
+def merge_stats(shard_stats):
+    """Add up the statistics of several shards"""
+    merged = {
+        "games": sum(s["games"] for s in shard_stats),
+        "wins": [sum(s["wins"][i] for s in shard_stats) for i in range(3)],
+        "total_payoffs": [sum(s["total_payoffs"][i] for s in shard_stats) for i in range(2)],
+        "total_squared_payoffs": [sum(s["total_squared_payoffs"][i] for s in shard_stats) for i in range(2)],
+        "unique_hands": set(),
+    }
+    for s in shard_stats:
+        merged["unique_hands"] |= s["unique_hands"]
+    # Online bluff analytics of the shards, combined in shard order
+    analytics = [s["bluff_analytics"] for s in shard_stats if s.get("bluff_analytics") is not None]
+    if analytics:
+        merged["bluff_analytics"] = analytics[0]
+        for shard_analytics in analytics[1:]:
+            merged["bluff_analytics"].merge(shard_analytics)
+    return merged
+
+
+def confidence_intervals(stats, z=1.96):
+    """Normal-approximation confidence intervals (95% by default) of the rates and mean payoffs"""
+    n = stats["games"]
+    intervals = {}
+    for name, count in zip(("dqn_win_rate", "cfr_win_rate", "draw_rate"), stats["wins"]):
+        rate = count / n
+        half_width = z * np.sqrt(rate * (1 - rate) / n)
+        intervals[name] = (rate, half_width)
+    for name, total, total_sq in zip(("dqn_payoff", "cfr_payoff"), stats["total_payoffs"], stats["total_squared_payoffs"]):
+        mean = total / n
+        variance = max(total_sq / n - mean ** 2, 0.0) * n / max(n - 1, 1)
+        intervals[name] = (mean, z * np.sqrt(variance / n))
+    return intervals
+
+
+def shard_sizes(num_games, num_shards):
+    return [num_games // num_shards + (i < num_games % num_shards) for i in range(num_shards)]
+
+
+def _evaluate_shard(args):
+    """Worker of evaluate_sharded: plays one shard with its own seed, log segment and analytics"""
+    import torch
+
+    shard, shard_seed, first_game, num_games = args
+    torch.set_num_threads(1)
+    set_seed(shard_seed)
+    env = LeducholdemEnv(config={'seed': shard_seed, 'allow_step_back': False})
+    dqn_agent, cfr_agent = load_agents(env)
+    env.set_agents([dqn_agent, cfr_agent])
+    log_writer = GameLogWriter(shard_log_path(LOG_PATH, shard)) if WRITE_GAME_LOG else None
+    analytics = OnlineBluffAnalytics() if ONLINE_ANALYTICS else None
+    if LOCKSTEP_BATCH_SIZE > 0:
+        stats = play_games_lockstep(dqn_agent, cfr_agent, first_game, num_games, log_writer,
+                                    LOCKSTEP_BATCH_SIZE, shard_seed, progress_every=0, analytics=analytics)
+    else:
+        stats = play_games(env, dqn_agent, cfr_agent, first_game, num_games, log_writer, progress_every=0,
+                           analytics=analytics)
+    if log_writer is not None:
+        log_writer.close()
+    if analytics is not None:
+        analytics.flush()
+        stats["bluff_analytics"] = analytics
+    return stats
+
+
+def merge_log_segments(num_shards):
+    """Concatenate the shard log segments, in shard order, into the game log"""
+    segments = [shard_log_path(LOG_PATH, shard) for shard in range(num_shards)]
+    merge_game_logs(segments, LOG_PATH)
+    for segment in segments:
+        shutil.rmtree(segment)
+
+
+def evaluate_sharded(num_workers=None, num_games=None, seed=None, merge_logs=True):
+    """
+    Play the evaluation games in num_workers processes, one shard per worker.
+
+    Shard seeds are spawned from np.random.SeedSequence(seed), so results are reproducible for
+    a given seed and worker count. Arguments default to NUM_WORKERS, NUM_GAMES and SEED. Each shard writes its own log segment, numbered with global
+    game ids; with merge_logs the segments are concatenated into the game log.
+    """
+    num_workers = NUM_WORKERS if num_workers is None else num_workers
+    num_games = NUM_GAMES if num_games is None else num_games
+    seed = SEED if seed is None else seed
+    os.makedirs(SAVE_DIR, exist_ok=True)
+    shard_seeds = [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(num_workers)]
+    sizes = shard_sizes(num_games, num_workers)
+    first_games = np.cumsum([1] + sizes[:-1])
+    shard_args = [(shard, shard_seeds[shard], int(first_games[shard]), sizes[shard]) for shard in range(num_workers)]
+
+    with mp.get_context().Pool(num_workers) as pool:
+        shard_stats = pool.map(_evaluate_shard, shard_args)
+
+    if merge_logs and WRITE_GAME_LOG:
+        merge_log_segments(num_workers)
+        if EXPORT_JSONL:
+            export_jsonl(GameLog.load(LOG_PATH), LOG_ALL_PATH, LOG_CFR_PATH, LOG_DQN_PATH)
+    return merge_stats(shard_stats)
+
+
+def print_summary(stats):
+    wins, total_payoffs, n = stats["wins"], stats["total_payoffs"], stats["games"]
+    intervals = confidence_intervals(stats)
 
     # Final statistics
     print("\n" + "=" * 70)
     print("EVALUATION COMPLETE")
     print("=" * 70)
-    print(f"Total games played: {NUM_GAMES}")
-    print(f"DQN wins: {wins[0]} ({wins[0] / NUM_GAMES * 100:.2f}%)")
-    print(f"CFR wins: {wins[1]} ({wins[1] / NUM_GAMES * 100:.2f}%)")
-    print(f"Draws: {wins[2]} ({wins[2] / NUM_GAMES * 100:.2f}%)")
-    print(f"\nAverage payoffs:")
-    print(f"  DQN: {total_payoffs[0] / NUM_GAMES:.4f}")
-    print(f"  CFR: {total_payoffs[1] / NUM_GAMES:.4f}")
-    print(f"\nUnique hands seen: {len(unique_hands)} out of 52 possible")
-    print(f"\nLog files saved to:")
-    print(f"  ➤ All games: {LOG_ALL_PATH}")
-    print(f"  ➤ CFR POV:   {LOG_CFR_PATH}")
-    print(f"  ➤ DQN POV:   {LOG_DQN_PATH}")
+    print(f"Total games played: {n}")
+    print(f"DQN wins: {wins[0]} ({wins[0] / n * 100:.2f}% ± {intervals['dqn_win_rate'][1] * 100:.2f})")
+    print(f"CFR wins: {wins[1]} ({wins[1] / n * 100:.2f}% ± {intervals['cfr_win_rate'][1] * 100:.2f})")
+    print(f"Draws: {wins[2]} ({wins[2] / n * 100:.2f}%)")
+    print(f"\nAverage payoffs (95% CI):")
+    print(f"  DQN: {total_payoffs[0] / n:.4f} ± {intervals['dqn_payoff'][1]:.4f}")
+    print(f"  CFR: {total_payoffs[1] / n:.4f} ± {intervals['cfr_payoff'][1]:.4f}")
+    print(f"\nUnique hands seen: {len(stats['unique_hands'])} out of 52 possible")
+    if WRITE_GAME_LOG:
+        print(f"\nLog files saved to:")
+        print(f"  ➤ Game log:  {LOG_PATH}")
+    if WRITE_GAME_LOG and EXPORT_JSONL:
+        print(f"  ➤ All games: {LOG_ALL_PATH}")
+        print(f"  ➤ CFR POV:   {LOG_CFR_PATH}")
+        print(f"  ➤ DQN POV:   {LOG_DQN_PATH}")
 
     if wins[2] > 0:
         print(f"\nWARNING: Found {wins[2]} draws with custom judger!")
@@ -259,5 +476,50 @@ def evaluate():
         print("\n✓ No draws found (expected with deterministic custom judger)")
 
 
+def evaluate():
+
+    if NUM_WORKERS > 1:
+        print(f"\nStarting sharded evaluation of {NUM_GAMES} games on {NUM_WORKERS} workers...")
+        stats = evaluate_sharded()
+        print_summary(stats)
+        if "bluff_analytics" in stats:
+            stats["bluff_analytics"].summary()
+        return
+
+    set_seed(SEED)
+
+    os.makedirs(SAVE_DIR, exist_ok=True)
+
+    # Create custom environment
+    env = LeducholdemEnv(config={'seed': SEED, 'allow_step_back': False})
+    env.reset()
+    print("=" * 70)
+    print(f"Using environment: {env.name}")
+    print(f"Judger module: {env.game.judger.__class__.__module__}")
+    print(f"Has RANK_ORDER: {hasattr(env.game.judger, 'RANK_ORDER')}")
+    print("=" * 70)
+
+    # Load agents
+    dqn_agent, cfr_agent = load_agents(env)
+    env.set_agents([dqn_agent, cfr_agent])
+
+    print(f"\nStarting evaluation of {NUM_GAMES} games...")
+
+    log_writer = GameLogWriter(LOG_PATH) if WRITE_GAME_LOG else None
+    analytics = OnlineBluffAnalytics() if ONLINE_ANALYTICS else None
+    if LOCKSTEP_BATCH_SIZE > 0:
+        stats = play_games_lockstep(dqn_agent, cfr_agent, 1, NUM_GAMES, log_writer, LOCKSTEP_BATCH_SIZE, SEED,
+                                    analytics=analytics)
+    else:
+        stats = play_games(env, dqn_agent, cfr_agent, 1, NUM_GAMES, log_writer, analytics=analytics)
+    if log_writer is not None:
+        log_writer.close()
+        if EXPORT_JSONL:
+            export_jsonl(GameLog.load(LOG_PATH), LOG_ALL_PATH, LOG_CFR_PATH, LOG_DQN_PATH)
+    print_summary(stats)
+    if analytics is not None:
+        analytics.summary()
+
+
 if __name__ == '__main__':
     evaluate()
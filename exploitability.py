@@ -0,0 +1,162 @@
+import pickle
+import sys
+
+import numpy as np
+
+from BNAIC_paper_files.custom_leduc_rlcard.public_tree import build_public_tree, chance_weights
+from BNAIC_paper_files.custom_leduc_rlcard.infoset import NUM_CHIP_STATES
+from BNAIC_paper_files.custom_leduc_rlcard.utils import NUM_CARDS, NO_PUBLIC_CARD, SHOWDOWN_WINNER
+from BNAIC_paper_files.cfr_tables import DenseCFRTables
+
+NUM_ACTIONS = 4
+
+_CARDS = np.arange(NUM_CARDS)
+
+
+class CFRPolicy:
+    """Average CFR strategy, played like CFRWrapper (legal actions renormalized, uniform if unseen)"""
+
+    def __init__(self, tables):
+        self.average_policy = tables.average_policy
+
+    def action_probs(self, node, player):
+        """(52, 4) probabilities per hand before the flop, (52, 52, 4) per (hand, public card) after"""
+        if node.round_counter == 0:
+            cards = _CARDS * (NUM_CARDS + 1) + NO_PUBLIC_CARD
+        else:
+            cards = _CARDS[:, None] * (NUM_CARDS + 1) + _CARDS[None, :]
+        probs = np.zeros(cards.shape + (NUM_ACTIONS,))
+        probs[..., node.action_ids] = self.average_policy[cards * NUM_CHIP_STATES + node.chip_state(player)][..., node.action_ids]
+        total = probs.sum(axis=-1, keepdims=True)
+        uniform = np.zeros(NUM_ACTIONS)
+        uniform[node.action_ids] = 1 / len(node.action_ids)
+        return np.where(total > 0, probs / np.where(total > 0, total, 1), uniform)
+
+
+class DQNPolicy:
+    """Greedy DQN policy, as played by DQNAgent.eval_step"""
+
+    def __init__(self, dqn_agent):
+        self.agent = dqn_agent
+
+    def action_probs(self, node, player):
+        """(52, 4) one-hot actions per hand before the flop, (52, 52, 4) per (hand, public card) after"""
+        if node.round_counter == 0:
+            obs = node.observations(player, _CARDS)
+            shape = (NUM_CARDS,)
+        else:
+            obs = node.observations(player, np.repeat(_CARDS, NUM_CARDS), np.tile(_CARDS, NUM_CARDS))
+            shape = (NUM_CARDS, NUM_CARDS)
+        q_values = self.agent.q_estimator.predict_nograd(obs)
+        legal = np.zeros(NUM_ACTIONS, dtype=bool)
+        legal[node.action_ids] = True
+        actions = np.argmax(np.where(legal, q_values, -np.inf), axis=1)
+        return np.eye(NUM_ACTIONS)[actions].reshape(shape + (NUM_ACTIONS,))
+
+
+class _TreeEvaluator:
+    """
+    Walks the public trees of both small blind seats with (hand of player 0, hand of player 1,
+    public card) arrays. Player 1 plays a fixed policy, player 0 either best-responds or plays
+    another policy.
+    """
+
+    def __init__(self, policy, responder=None):
+        self.policy = policy
+        self.responder = responder
+        self.roots = [build_public_tree(small_blind) for small_blind in range(2)]
+        # Each small blind seat has probability 1/2, player 0's hand 1/52
+        self.chance = chance_weights() / (len(self.roots) * NUM_CARDS)
+        self.wins = SHOWDOWN_WINNER[:, :, :NUM_CARDS] == 0
+
+    def _walk(self, node, reach):
+        """Utility of player 0 for every (hand 0, hand 1, public card), reach excludes player 0"""
+        if node.is_terminal():
+            if node.folded >= 0:
+                return node.payoffs(1 - node.folded)[0]
+            return np.where(self.wins, node.payoffs(0)[0], node.payoffs(1)[0])
+
+        if node.player == 1 or self.responder is not None:
+            policy = self.policy if node.player == 1 else self.responder
+            probs = policy.action_probs(node, node.player)
+            # Player 1's cards are the second axis, player 0's the first
+            if node.round_counter == 0:
+                probs = probs[None, :, None, :] if node.player == 1 else probs[:, None, None, :]
+            else:
+                probs = probs[None, :, :, :] if node.player == 1 else probs[:, None, :, :]
+            utility = np.zeros_like(reach)
+            for action, child in zip(node.action_ids, node.children):
+                prob = probs[..., action]
+                if not prob.any():
+                    continue
+                child_reach = reach * prob if node.player == 1 else reach
+                utility += prob * self._walk(child, child_reach)
+            return utility
+
+        # Best response: player 0 knows its hand (and the public card) and picks the best action
+        sum_axes = (1, 2) if node.round_counter == 0 else 1
+        utilities = [self._walk(child, reach) for child in node.children]
+        values = np.stack([np.sum(reach * u, axis=sum_axes) for u in utilities])
+        best = np.argmax(values, axis=0)
+        best = best[:, None, None] if node.round_counter == 0 else best[:, None, :]
+        utility = np.zeros_like(reach)
+        for i, u in enumerate(utilities):
+            utility = np.where(best == i, u, utility)
+        return utility
+
+    def value(self):
+        """Expected payoff of player 0 per hand, in big blinds"""
+        return float(sum(np.sum(self.chance * self._walk(root, self.chance)) for root in self.roots))
+
+
+def best_response_value(policy):
+    """
+    Exact value of a best response against a policy, averaged over all deals and both seats.
+
+    Args:
+        policy: CFRPolicy or DQNPolicy
+
+    Returns:
+        (float): Big blinds per hand won by the best response
+    """
+    return _TreeEvaluator(policy).value()
+
+
+def exploitability(policy):
+    """
+    Exploitability of a policy in big blinds per hand. The game is symmetric (both seats are
+    dealt the small blind equally often), so the game value is 0 and the exploitability is the
+    best-response value, which is 0 only for an equilibrium policy.
+    """
+    return best_response_value(policy)
+
+
+def expected_value(policy, opponent_policy):
+    """Exact expected payoff of policy against opponent_policy, in big blinds per hand"""
+    return _TreeEvaluator(opponent_policy, responder=policy).value()
+
+
+def load_cfr_policy(path):
+    with open(path, 'rb') as f:
+        return CFRPolicy(DenseCFRTables.from_data(pickle.load(f)))
+
+
+def load_dqn_policy(path, mlp_layers=(256, 256)):
+    import torch
+    from rlcard.agents import DQNAgent
+
+    device = torch.device('cpu')
+    dqn_agent = DQNAgent(num_actions=NUM_ACTIONS, state_shape=[156], mlp_layers=list(mlp_layers), device=device)
+    dqn_agent.q_estimator.qnet.load_state_dict(torch.load(path, map_location=device))
+    dqn_agent.q_estimator.qnet.eval()
+    return DQNPolicy(dqn_agent)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print('Usage: python -m BNAIC_paper_files.exploitability <cfr.pkl | dqn.pt>')
+        sys.exit(1)
+    model_path = sys.argv[1]
+    policy = load_dqn_policy(model_path) if model_path.endswith('.pt') else load_cfr_policy(model_path)
+    value = exploitability(policy)
+    print(f"Exploitability of {model_path}: {value:.4f} big blinds per hand ({1000 * value:.1f} mbb/hand)")
@@ -0,0 +1,283 @@
+import json
+import os
+
+import numpy as np
+
+from BNAIC_paper_files.custom_leduc_rlcard.utils import INDEX2CARD, CARD2INDEX
+
+# Action ids of LeducholdemEnv
+ACTIONS = ['call', 'raise', 'fold', 'check']
+
+NO_CARD = -1
+
+# One record per hand. Steps of game i are steps[step_start[i]:step_start[i] + num_steps[i]]
+GAME_DTYPE = np.dtype([
+    ('game', np.int64),
+    ('hands', np.int8, (2,)),       # Hand card of player 0 and player 1
+    ('public_card', np.int8),       # NO_CARD if the hand ended before the flop
+    ('payoffs', np.float32, (2,)),  # In big blinds
+    ('step_start', np.int64),
+    ('num_steps', np.int8),
+])
+
+# One record per decision
+STEP_DTYPE = np.dtype([
+    ('player', np.int8),
+    ('action', np.int8),        # Action id returned by the agent
+    ('legal_mask', np.uint8),   # Bit a is set if action id a was legal
+    ('round', np.int8),         # 0 before the flop, 1 after it
+])
+
+GAMES_FILE = 'games.npy'
+STEPS_FILE = 'steps.npy'
+
+
+def legal_mask(legal_actions):
+    """Bit mask of an iterable of legal action ids"""
+    mask = 0
+    for a in legal_actions:
+        mask |= 1 << int(a)
+    return mask
+
+
+class GameLogWriter:
+    """
+    Collects game and step records and writes them as two .npy structured arrays into a directory.
+    Each hand is stored once; the per-player views are derived when reading (see GameLog.pov).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._games = []
+        self._steps = []
+        self._num_games = 0
+        self._num_steps = 0
+
+    def add_game(self, game_num, hands, public_card, payoffs, steps):
+        """
+        Args:
+            game_num (int): Game id
+            hands (tuple): Hand card ids of player 0 and player 1
+            public_card (int): Public card id, NO_CARD if it was not revealed
+            payoffs (list): Payoffs of player 0 and player 1
+            steps (list): (player, action, legal_mask, round) of every decision
+        """
+        game = np.zeros(1, dtype=GAME_DTYPE)
+        game['game'] = game_num
+        game['hands'] = hands
+        game['public_card'] = public_card
+        game['payoffs'] = payoffs
+        game['step_start'] = self._num_steps
+        game['num_steps'] = len(steps)
+        self._games.append(game)
+        self._steps.append(np.array(steps, dtype=STEP_DTYPE))
+        self._num_games += 1
+        self._num_steps += len(steps)
+
+    def add_games(self, games, steps):
+        """Append ready-made record arrays; games['step_start'] is relative to the first step given"""
+        games = games.copy()
+        games['step_start'] += self._num_steps
+        self._games.append(games)
+        self._steps.append(steps)
+        self._num_games += len(games)
+        self._num_steps += len(steps)
+
+    def __len__(self):
+        return self._num_games
+
+    def to_log(self):
+        """The records added so far, as an in-memory GameLog"""
+        games = np.concatenate(self._games) if self._games else np.zeros(0, dtype=GAME_DTYPE)
+        steps = np.concatenate(self._steps) if self._steps else np.zeros(0, dtype=STEP_DTYPE)
+        return GameLog(games, steps)
+
+    def close(self):
+        os.makedirs(self.path, exist_ok=True)
+        log = self.to_log()
+        np.save(os.path.join(self.path, GAMES_FILE), log.games)
+        np.save(os.path.join(self.path, STEPS_FILE), log.steps)
+
+
+def _next_opponent_steps(player, game_index):
+    """Index of the next step of the other player in the same game, -1 if there is none"""
+    num_steps = len(player)
+    # Runs of consecutive steps of one player within a game; the next run is the opponent's
+    run_start = np.ones(num_steps, dtype=bool)
+    run_start[1:] = (player[1:] != player[:-1]) | (game_index[1:] != game_index[:-1])
+    starts = np.flatnonzero(run_start)
+    next_step = np.append(starts[1:], -1)[np.cumsum(run_start) - 1]
+    same_game = game_index[np.maximum(next_step, 0)] == game_index
+    return np.where((next_step >= 0) & same_game, next_step, -1)
+
+
+class StepColumns:
+    """
+    Per-decision columns of a game log, one array entry per step in log order. Only player,
+    action, legal_mask and round are views of the step records, which stay memory-mapped if the
+    log is. The other columns are built in memory for every step (about 46 bytes per step), so
+    on large logs build the columns of one GameLog.game_range at a time.
+    """
+
+    def __init__(self, log):
+        games, steps = log.games, log.steps
+        # Index into log.games of every step
+        self.game_index = log.step_game_index()
+        self.game = games['game'][self.game_index]
+        # Position of the step within its game
+        self.step = np.arange(len(steps)) - games['step_start'][self.game_index]
+        self.player = steps['player']
+        self.action = steps['action']
+        self.legal_mask = steps['legal_mask']
+        self.round = steps['round']
+        self.hand = games['hands'][self.game_index, self.player]
+        # Public card as seen at the step, NO_CARD before the flop
+        self.public_card = np.where(self.round > 0, games['public_card'][self.game_index], NO_CARD)
+        # Payoffs of both players, and of the acting player, at the end of the game
+        self.payoffs = games['payoffs'][self.game_index]
+        self.payoff = self.payoffs[np.arange(len(steps)), self.player]
+        # Reaction of the opponent to each step: its next step in the same game, -1 if none
+        self.next_opponent_step = _next_opponent_steps(self.player, self.game_index)
+
+    def reactions(self, steps):
+        """Action and round of the opponent's reaction to each of the given steps, action -1 if none"""
+        next_steps = self.next_opponent_step[steps]
+        reacted = next_steps >= 0
+        actions = np.where(reacted, self.action[next_steps], -1)
+        rounds = np.where(reacted, self.round[next_steps], 0)
+        return actions, rounds
+
+    def __len__(self):
+        return len(self.player)
+
+
+class GameLog:
+    """Game and step records of a binary game log"""
+
+    def __init__(self, games, steps):
+        self.games = games
+        self.steps = steps
+        self._columns = None
+
+    @classmethod
+    def load(cls, path, mmap_mode=None):
+        games = np.load(os.path.join(path, GAMES_FILE), mmap_mode=mmap_mode)
+        steps = np.load(os.path.join(path, STEPS_FILE), mmap_mode=mmap_mode)
+        return cls(games, steps)
+
+    def __len__(self):
+        return len(self.games)
+
+    def step_game_index(self):
+        """Index into games of every step"""
+        return np.repeat(np.arange(len(self.games)), self.games['num_steps'])
+
+    def game_range(self, first_game, last_game):
+        """
+        Games first_game:last_game as a GameLog. The step records are a view (memory-mapped if
+        this log is); the game records are copied, with step_start made relative to the range.
+        """
+        games = np.array(self.games[first_game:last_game])
+        if len(games) == 0:
+            return GameLog(games, self.steps[:0])
+        start = int(games['step_start'][0])
+        end = int(games['step_start'][-1] + games['num_steps'][-1])
+        games['step_start'] -= start
+        return GameLog(games, self.steps[start:end])
+
+    def columns(self):
+        """Per-step columns (StepColumns) of the whole log, built on first use"""
+        if self._columns is None:
+            self._columns = StepColumns(self)
+        return self._columns
+
+    def pov(self, player):
+        """Steps taken by one player, with the index of their game"""
+        mask = self.steps['player'] == player
+        return self.steps[mask], self.step_game_index()[mask]
+
+    def game_entries(self, i, player=None):
+        """Log entries of game i in the JSONL layout, optionally only those of one player"""
+        game = self.games[i]
+        start, count = int(game['step_start']), int(game['num_steps'])
+        entries = []
+        for step in self.steps[start:start + count]:
+            step_player = int(step['player'])
+            if player is not None and step_player != player:
+                continue
+            legal = int(step['legal_mask'])
+            entries.append({
+                "player_id": step_player,
+                "hand": INDEX2CARD[game['hands'][step_player]],
+                "public_card": INDEX2CARD[game['public_card']] if step['round'] > 0 else None,
+                "legal_actions": [name for a, name in enumerate(ACTIONS) if legal >> a & 1],
+                "action_record": None,
+                "action_taken": int(step['action']),
+            })
+        return entries
+
+
+def convert_jsonl(jsonl_path, out_path):
+    """Convert a JSONL log of the old evaluate() (all games) into a binary log directory"""
+    writer = GameLogWriter(out_path)
+    with open(jsonl_path, 'r') as f:
+        for line_num, line in enumerate(f):
+            data = json.loads(line)
+            hands = [NO_CARD, NO_CARD]
+            public_card = NO_CARD
+            steps = []
+            for entry in data['log']:
+                player = entry['player_id']
+                hands[player] = CARD2INDEX[entry['hand']]
+                if entry['public_card'] is not None:
+                    public_card = CARD2INDEX[entry['public_card']]
+                steps.append((player, entry['action_taken'], legal_mask(ACTIONS.index(a) for a in entry['legal_actions']),
+                              int(entry['public_card'] is not None)))
+            writer.add_game(data.get('game', line_num + 1), hands, public_card, data['payoffs'], steps)
+    writer.close()
+
+
+def open_game_log(path, mmap_mode='r'):
+    """
+    Open a game log for analysis, memory-mapped by default.
+
+    Args:
+        path (str): Binary log directory, or a JSONL log (all games). A JSONL log is converted
+            once into a binary log next to it (same name without .jsonl) and reused afterwards.
+
+    Returns:
+        (GameLog): The log
+    """
+    if os.path.isdir(path):
+        return GameLog.load(path, mmap_mode)
+    converted = os.path.splitext(path)[0]
+    games_file = os.path.join(converted, GAMES_FILE)
+    if not os.path.exists(games_file) or os.path.getmtime(games_file) < os.path.getmtime(path):
+        print(f"Converting {path} to a binary game log in {converted}...")
+        convert_jsonl(path, converted)
+    return GameLog.load(converted, mmap_mode)
+
+
+def merge_game_logs(paths, out_path):
+    """Concatenate several log directories (e.g. evaluation shards) in order"""
+    writer = GameLogWriter(out_path)
+    for path in paths:
+        log = GameLog.load(path)
+        games = log.games.copy()
+        games['step_start'] -= games['step_start'][0] if len(games) else 0
+        writer.add_games(games, log.steps)
+    writer.close()
+
+
+def export_jsonl(log, all_path, cfr_path, dqn_path):
+    """Write the three JSONL files of the old evaluation logs (all games, CFR POV, DQN POV)"""
+    with open(all_path, 'w') as all_f, open(cfr_path, 'w') as cfr_f, open(dqn_path, 'w') as dqn_f:
+        for i in range(len(log)):
+            game_num = int(log.games['game'][i])
+            payoffs = [float(p) for p in log.games['payoffs'][i]]
+            entries = log.game_entries(i)
+            all_f.write(json.dumps({"game": game_num, "log": entries, "payoffs": payoffs}) + '\n')
+            cfr_f.write(json.dumps({"game": game_num, "log": [e for e in entries if e["player_id"] == 1],
+                                    "payoffs": payoffs}) + '\n')
+            dqn_f.write(json.dumps({"game": game_num, "log": [e for e in entries if e["player_id"] == 0],
+                                    "payoffs": payoffs}) + '\n')
@@ -0,0 +1,87 @@
+from BNAIC_paper_files.bluff_analysis import PLAYER_NAMES, analyze_bluffs, merge_bluff_results, print_bluff_analysis
+from BNAIC_paper_files.game_log import GameLogWriter
+from BNAIC_paper_files.statistical_bluff_detection import StatisticalModel, analyze_statistical_bluffs_52card
+
+
+class OnlineBluffAnalytics:
+    """
+    Bluff statistics of an evaluation, updated while it runs so that no game log has to be
+    written or re-read afterwards.
+
+    Takes the records of finished hands like a game_log.GameLogWriter (add_game / add_games) and
+    folds them in every batch_games games: into the threshold bluff counters of both bluffers
+    (bluff_analysis.analyze_bluffs) and into the statistical detector's accumulators and raise
+    index (statistical_bluff_detection.StatisticalModel). Only the pending batch is kept in
+    memory. The analytics of evaluation shards are combined, in shard order, with merge().
+    """
+
+    def __init__(self, batch_games=10_000):
+        self.batch_games = batch_games
+        # analyze_bluffs results indexed by bluffer id, None before the first batch
+        self.threshold_results = None
+        self.model = StatisticalModel()
+        self._pending = GameLogWriter(None)
+
+    def add_game(self, game_num, hands, public_card, payoffs, steps):
+        """Record one finished hand, same arguments as GameLogWriter.add_game"""
+        self._pending.add_game(game_num, hands, public_card, payoffs, steps)
+        if len(self._pending) >= self.batch_games:
+            self.flush()
+
+    def add_games(self, games, steps):
+        """Record a batch of finished hands, same arguments as GameLogWriter.add_games"""
+        self._pending.add_games(games, steps)
+        if len(self._pending) >= self.batch_games:
+            self.flush()
+
+    def flush(self):
+        """Fold the pending hands into the statistics"""
+        if len(self._pending) == 0:
+            return
+        log = self._pending.to_log()
+        self._pending = GameLogWriter(None)
+
+        results = [analyze_bluffs(log, bluffer_id) for bluffer_id in range(len(PLAYER_NAMES))]
+        if self.threshold_results is None:
+            self.threshold_results = results
+        else:
+            for merged, batch in zip(self.threshold_results, results):
+                merge_bluff_results(merged, batch)
+        self.model.add_log(log)
+
+    def merge(self, other):
+        """Add the statistics of the analytics of the games that follow, e.g. of the next shard"""
+        self.flush()
+        other.flush()
+        if self.threshold_results is None:
+            self.threshold_results = other.threshold_results
+        elif other.threshold_results is not None:
+            for merged, results in zip(self.threshold_results, other.threshold_results):
+                merge_bluff_results(merged, results)
+        self.model.merge(other.model)
+        return self
+
+    def summary(self):
+        """
+        Print the threshold and statistical bluff reports of both players.
+
+        Returns:
+            (tuple): analyze_bluffs results and analyze_statistical_bluffs_52card results,
+                each indexed by player id
+        """
+        self.flush()
+        if self.threshold_results is None:
+            print("No games recorded, no bluff analysis")
+            return [], []
+        self.model.finish()
+
+        for results in self.threshold_results:
+            print_bluff_analysis(results)
+
+        statistical_results = []
+        for player_id, player_name in enumerate(PLAYER_NAMES):
+            print("\n" + "=" * 80)
+            print(f"ANALYZING {player_name} (Player {player_id}) - Statistical Bluffs")
+            print("=" * 80)
+            statistical_results.append(analyze_statistical_bluffs_52card(None, player_id, player_name, model=self.model))
+        return self.threshold_results, statistical_results
@@ -1,16 +1,20 @@
 import os
+import time
 import torch
 import pickle
-import json
-import wandb
+import multiprocessing as mp
 from rlcard.agents import DQNAgent
 from rlcard.utils import set_seed, reorganize
 from rlcard.envs.registration import register
 import numpy as np
-import collections
+from copy import copy
 
 # Import custom environment
 from BNAIC_paper_files.custom_leduc_rlcard.leducholdem import LeducholdemEnv
+from BNAIC_paper_files.custom_leduc_rlcard.infoset import infoset_from_obs_id, infoset_from_game
+from BNAIC_paper_files.cfr_tables import DenseCFRTables
+from BNAIC_paper_files.dqn_opponent import DQNOpponentCache
+from BNAIC_paper_files.vectorized_cfr import VectorizedCFR
 
 # Register the custom environment
 register(env_id="custom-leduc-holdem",
@@ -22,7 +26,6 @@ os.makedirs(SAVE_DIR, exist_ok=True)
 SAVE_DQN_PATH = os.path.join(SAVE_DIR, 'dqn_simultaneous_100K.pt')
 SAVE_CFR_PATH = os.path.join(SAVE_DIR, 'cfr_simultaneous_100K.pkl')
 
-wandb.init(project='BNAIC-simultaneous-training-100K', name='Simultaneous_DQN_CFR_52card_100K')
 config = {
     "env": "custom-leduc-holdem-52card",
     "train_episodes": 100_000,
@@ -36,6 +39,14 @@ config = {
     "memory_init_size": 1000,
     "replay_memory_size": 100_000,
     "iterations_per_episode": 10,
+    "batch_opponent_queries": True,  # One batched DQN forward pass per discovery sweep instead of one per node
+    "opponent_cache_size": 100_000,  # LRU bound of the DQN opponent action cache, None for unbounded
+    "cfr_workers": 0,  # >1 runs the CFR iterations of each episode in a pool of worker processes
+    "cfr_mode": "sampled",  # "sampled": one dealt hand per iteration, "vectorized": sweeps over all deals
+    "cfr_variant": "cfr+",  # Update rule of the vectorized mode: "cfr", "cfr+" or "dcfr"
+    "vectorized_sweeps_per_episode": 1,
+    "traversal_mode": "full",  # Sampled mode traversal: "full" / "external" (same thing here) or "outcome"
+    "outcome_exploration": 0.6,  # Uniform exploration mixed into the outcome-sampling policy
     "seed": 42,
     "deck_size": 52,
     "state_dim": 156,
@@ -51,15 +62,13 @@ class CFRWrapper:
         self.use_raw = False
 
     def step(self, state):
-        obs = state['obs'].tobytes()
+        infoset = infoset_from_obs_id(state['obs_id'])
         legal_actions = list(state['legal_actions'].keys())
-        if obs not in self.cfr.average_policy:
-            action_probs = [1 / len(legal_actions)] * self.env.num_actions
-        else:
-            raw_probs = self.cfr.average_policy[obs]
-            action_probs = [raw_probs[a] if a in legal_actions else 0 for a in range(self.env.num_actions)]
-            total = sum(action_probs)
-            action_probs = [p / total if total > 0 else 1 / len(legal_actions) for p in action_probs]
+        # Unseen info sets have an all-zero row and fall back to uniform
+        raw_probs = self.cfr.average_policy[infoset]
+        action_probs = [raw_probs[a] if a in legal_actions else 0 for a in range(self.env.num_actions)]
+        total = sum(action_probs)
+        action_probs = [p / total if total > 0 else 1 / len(legal_actions) for p in action_probs]
         return torch.multinomial(torch.tensor(action_probs), 1).item()
 
     def eval_step(self, state):
@@ -68,46 +77,304 @@ class CFRWrapper:
 
 
 # === CFR Agent That Trains Against Live DQN ===
-def zero_array_4():
-    return np.zeros(4)
+# Deeper than any Leduc betting sequence (at most 4 actions per round)
+MAX_TREE_DEPTH = 16
+
+# The opponent is a deterministic greedy DQN and chance is sampled by the deal, so expanding every
+# action of the CFR player (traverse_tree) already is external-sampling MCCFR; 'external' is an alias
+TRAVERSAL_MODES = ('full', 'external', 'outcome')
 
 
 class CFRAgainstDQNAgent:
-    def __init__(self, env, player_id, opponent_agent, model_path):
+    def __init__(self, env, player_id, opponent_agent, model_path, batch_opponent_queries=False,
+                 opponent_cache_size=None, traversal_mode='full', exploration=0.6, seed=None):
         self.env = env
         self.player_id = player_id
         self.opponent_agent = opponent_agent
         self.model_path = model_path
         self.use_raw = False
 
-        self.policy = collections.defaultdict(list)
-        self.average_policy = collections.defaultdict(zero_array_4)
-        self.regrets = collections.defaultdict(zero_array_4)
+        # Opponent actions memoized per info set until the DQN weights change, see run_iterations for batching
+        self.opponent_cache = DQNOpponentCache(opponent_agent, env.num_actions, max_size=opponent_cache_size)
+        self.batch_opponent_queries = batch_opponent_queries
+
+        # 'full' / 'external': traverse_tree, 'outcome': traverse_outcome
+        if traversal_mode not in TRAVERSAL_MODES:
+            raise ValueError(f"Unknown traversal mode {traversal_mode!r}, expected one of {TRAVERSAL_MODES}")
+        self.traversal_mode = traversal_mode
+        # Share of uniform exploration in the outcome-sampling policy
+        self.exploration = exploration
+        # Action sampling only, so the deals do not depend on the traversal mode
+        self.np_random = np.random.RandomState(seed)
+
+        # Dense (num_infosets, num_actions) arrays, see cfr_tables.py
+        self.tables = DenseCFRTables(num_actions=env.num_actions)
+        self.policy = self.tables.policy
+        self.average_policy = self.tables.average_policy
+        self.regrets = self.tables.regrets
+        # Regrets the current strategy is computed from; a worker of CFRWorkerPool reads a frozen copy
+        # of the master regrets here while its updates go to self.tables
+        self.strategy_tables = self.tables
         self.iteration = 0
 
-    def regret_matching(self, obs):
-        regret = self.regrets[obs]
-        pos_regret = np.maximum(regret, 0)
-        total = np.sum(pos_regret)
-        return pos_regret / total if total > 0 else np.ones(self.env.num_actions) / self.env.num_actions
+        # Per-depth buffers of the iterative traversal
+        num_actions, num_players = env.num_actions, env.num_players
+        self._reach = np.zeros((MAX_TREE_DEPTH + 1, num_players))
+        self._strategy = np.zeros((MAX_TREE_DEPTH, num_actions))
+        self._action_utils = np.zeros((MAX_TREE_DEPTH, num_actions))
+        self._node_util = [0.0] * MAX_TREE_DEPTH
+        self._infoset = [0] * MAX_TREE_DEPTH
+        self._legal_actions = [None] * MAX_TREE_DEPTH
+        self._next_action = [0] * MAX_TREE_DEPTH
+
+    def regret_matching(self, infoset):
+        return self.strategy_tables.regret_matching(infoset)
 
     def traverse_tree(self, probs):
+        """
+        One CFR iteration from the current env state, walked with an explicit stack.
+
+        Visits nodes and applies regret and average-policy updates in the same order as
+        traverse_tree_recursive, using preallocated per-depth reach and utility buffers.
+        Steps the underlying game directly, so no state dicts are built at CFR nodes.
+        """
+        env = self.env
+        game = env.game
+        player_id = self.player_id
+        reach = self._reach
+        strategies = self._strategy
+        action_utils = self._action_utils
+        node_util = self._node_util
+        infosets = self._infoset
+        legal = self._legal_actions
+        next_action = self._next_action
+        action_ids = env.action_index
+
+        reach[0] = probs
+        depth = 0
+        entering = True
+        value = 0.0
+
+        while True:
+            if entering:
+                if game.is_over():
+                    value = game.get_payoffs()[player_id]
+                    entering = False
+                    continue
+
+                current_player = game.game_pointer
+                if current_player != player_id:
+                    action = self.opponent_cache.action(env, current_player)
+                    legal[depth] = None
+                    reach[depth + 1] = reach[depth]
+                    game.apply_action(env._decode_action(action))
+                    depth += 1
+                    continue
+
+                infoset = infoset_from_game(game, current_player)
+                infosets[depth] = infoset
+                legal[depth] = game.get_legal_actions()
+                self.strategy_tables.regret_matching(infoset, out=strategies[depth])
+                action_utils[depth] = 0
+                node_util[depth] = 0
+                next_action[depth] = 0
+            else:
+                # Hand the value of the finished subtree to its parent
+                if depth == 0:
+                    break
+                depth -= 1
+                game.step_back()
+                if legal[depth] is None:
+                    continue
+
+                action = action_ids[legal[depth][next_action[depth]]]
+                action_utils[depth, action] = value
+                node_util[depth] += strategies[depth, action] * value
+                next_action[depth] += 1
+
+            if next_action[depth] < len(legal[depth]):
+                # Descend into the next action of this CFR node
+                raw_action = legal[depth][next_action[depth]]
+                action = action_ids[raw_action]
+                reach[depth + 1] = reach[depth]
+                reach[depth + 1, player_id] *= strategies[depth, action]
+                game.apply_action(raw_action)
+                depth += 1
+                entering = True
+                continue
+
+            # All actions done: update regrets and average policy
+            actions = [action_ids[a] for a in legal[depth]]
+            infoset = infosets[depth]
+            strategy = strategies[depth]
+            cf_prob = 1.0
+            for p in range(env.num_players):
+                if p != player_id:
+                    cf_prob *= reach[depth, p]
+            self.regrets[infoset, actions] += cf_prob * (action_utils[depth, actions] - node_util[depth])
+            self.average_policy[infoset, actions] += reach[depth, player_id] * strategy[actions]
+            self.policy[infoset] = strategy
+            self.tables.visited[infoset] = True
+
+            value = node_util[depth]
+            entering = False
+
+        return np.array([value if i == player_id else 0 for i in range(env.num_players)])
+
+    def traverse_outcome(self):
+        """
+        One outcome-sampling MCCFR iteration from the current env state.
+
+        Follows a single trajectory: the CFR player samples one action per node from its strategy
+        mixed with exploration, and regrets and average policy are updated with importance-weighted
+        estimates of the updates traverse_tree would make for the same deal.
+        """
+        env = self.env
+        game = env.game
+        player_id = self.player_id
+        action_ids = env.action_index
+        # (infoset, legal action ids, strategy, sampled action) of each CFR node on the trajectory
+        path = []
+        own_reach = 1.0
+        sample_prob = 1.0
+        steps = 0
+
+        while not game.is_over():
+            current_player = game.game_pointer
+            if current_player != player_id:
+                action = self.opponent_cache.action(env, current_player)
+                game.apply_action(env._decode_action(action))
+                steps += 1
+                continue
+
+            infoset = infoset_from_game(game, current_player)
+            legal_actions = game.get_legal_actions()
+            actions = [action_ids[a] for a in legal_actions]
+            strategy = self.strategy_tables.regret_matching(infoset)
+            legal_probs = strategy[actions]
+            total = legal_probs.sum()
+            legal_probs = legal_probs / total if total > 0 else np.ones(len(actions)) / len(actions)
+            sampling_probs = self.exploration / len(actions) + (1 - self.exploration) * legal_probs
+            choice = self.np_random.choice(len(actions), p=sampling_probs)
+
+            self.average_policy[infoset, actions] += own_reach / sample_prob * strategy[actions]
+            self.policy[infoset] = strategy
+            self.tables.visited[infoset] = True
+
+            path.append((infoset, actions, strategy, actions[choice]))
+            own_reach *= strategy[actions[choice]]
+            sample_prob *= sampling_probs[choice]
+            game.apply_action(legal_actions[choice])
+            steps += 1
+
+        utility = game.get_payoffs()[player_id]
+        for _ in range(steps):
+            game.step_back()
+
+        # Walk back up, tail is the CFR player's probability of the rest of the trajectory
+        weighted_utility = utility / sample_prob
+        tail = 1.0
+        for infoset, actions, strategy, action in reversed(path):
+            tail_before = strategy[action] * tail
+            self.regrets[infoset, actions] -= weighted_utility * tail_before
+            self.regrets[infoset, action] += weighted_utility * tail
+            tail = tail_before
+
+        return np.array([utility if i == player_id else 0 for i in range(env.num_players)])
+
+    def traverse(self):
+        """One iteration of the selected traversal mode from the current env state"""
+        if self.traversal_mode == 'outcome':
+            return self.traverse_outcome()
+        return self.traverse_tree(np.ones(self.env.num_players))
+
+    def run_iterations(self, num_iterations):
+        """
+        Deal num_iterations hands and run one CFR traversal on each.
+
+        With batch_opponent_queries, all hands are dealt up front into copies of the game and
+        their opponent info sets are found by cheap discovery walks. Each sweep over the hands
+        ends with one batched DQN forward pass, and the hands are then traversed with the cached
+        opponent actions. Deals and updates are the same as traversing hand by hand, as long as
+        the DQN weights do not change during the call. Outcome sampling visits a single
+        trajectory per hand, so it always goes hand by hand.
+        """
+        if not self.batch_opponent_queries or self.traversal_mode == 'outcome':
+            for _ in range(num_iterations):
+                self.env.reset()
+                self.traverse()
+                self.iteration += 1
+            return
+
+        # The copies share the env's RNG, so the deals come out in the same order as env.reset()
+        env_game = self.env.game
+        games = []
+        for _ in range(num_iterations):
+            game = copy(env_game)
+            game.init_game()
+            games.append(game)
+
+        # Nothing is evicted until the traversals below have used the flushed actions
+        self.opponent_cache.begin_batch()
+        try:
+            unresolved = games
+            # Opponent actions reveal deeper opponent nodes, so sweep until nothing is queued
+            while unresolved:
+                still_unresolved = []
+                for game in unresolved:
+                    self.env.game = game
+                    if self._discover_opponent_nodes():
+                        still_unresolved.append(game)
+                self.opponent_cache.flush()
+                unresolved = still_unresolved
+
+            for game in games:
+                self.env.game = game
+                self.traverse_tree(np.ones(self.env.num_players))
+                self.iteration += 1
+        finally:
+            self.opponent_cache.end_batch()
+            self.env.game = env_game
+
+    def _discover_opponent_nodes(self):
+        """Walk the current tree without updates, queueing opponent nodes with no cached action"""
+        game = self.env.game
+        if game.is_over():
+            return False
+        current_player = game.game_pointer
+        if current_player != self.player_id:
+            action = self.opponent_cache.query(self.env, current_player)
+            if action is None:
+                return True
+            game.apply_action(self.env._decode_action(action))
+            queued = self._discover_opponent_nodes()
+            game.step_back()
+            return queued
+        queued = False
+        for action in game.get_legal_actions():
+            game.apply_action(action)
+            queued = self._discover_opponent_nodes() or queued
+            game.step_back()
+        return queued
+
+    def traverse_tree_recursive(self, probs):
+        """Reference recursive traversal, produces the same updates as traverse_tree"""
         if self.env.is_over():
             return self.env.get_payoffs()
 
         current_player = self.env.get_player_id()
         state = self.env.get_state(current_player)
-        obs = state['obs'].tobytes()
+        infoset = infoset_from_obs_id(state['obs_id'])
         legal_actions = list(state['legal_actions'].keys())
 
         if current_player != self.player_id:
             action, _ = self.opponent_agent.eval_step(state)
             self.env.step(action)
-            utility = self.traverse_tree(probs)
+            utility = self.traverse_tree_recursive(probs)
             self.env.step_back()
             return utility
 
-        strategy = self.regret_matching(obs)
+        strategy = self.regret_matching(infoset)
         action_utils = np.zeros(self.env.num_actions)
         node_util = 0
 
@@ -116,33 +383,131 @@ class CFRAgainstDQNAgent:
             new_probs = probs.copy()
             new_probs[current_player] *= prob
             self.env.step(action)
-            utility = self.traverse_tree(new_probs)
+            utility = self.traverse_tree_recursive(new_probs)
             self.env.step_back()
             action_utils[action] = utility[self.player_id]
             node_util += prob * utility[self.player_id]
 
         cf_prob = np.prod(probs[:current_player]) * np.prod(probs[current_player + 1:])
-        for action in legal_actions:
-            regret = cf_prob * (action_utils[action] - node_util)
-            self.regrets[obs][action] += regret
-            self.average_policy[obs][action] += probs[current_player] * strategy[action]
+        self.regrets[infoset, legal_actions] += cf_prob * (action_utils[legal_actions] - node_util)
+        self.average_policy[infoset, legal_actions] += probs[current_player] * strategy[legal_actions]
 
-        self.policy[obs] = strategy
+        self.policy[infoset] = strategy
+        self.tables.visited[infoset] = True
         return np.array([node_util if i == self.player_id else 0 for i in range(self.env.num_players)])
 
     def save(self):
-        data = {
-            'policy': dict(self.policy),
-            'average_policy': dict(self.average_policy),
-            'regrets': dict(self.regrets),
-            'iteration': self.iteration
-        }
+        data = self.tables.to_data()
+        data['iteration'] = self.iteration
         with open(self.model_path, 'wb') as f:
             pickle.dump(data, f)
 
 
+# === Parallel CFR Iterations ===
+def _cfr_worker(conn, seed, player_id, mlp_layers, agent_kwargs):
+    """
+    Worker process of CFRWorkerPool. Keeps a mirror of the master regrets and a frozen DQN,
+    traverses the hands it is asked for and sends back the sparse table updates.
+    """
+    torch.set_num_threads(1)
+    env = LeducholdemEnv(config={'seed': seed, 'allow_step_back': True})
+    dqn_agent = DQNAgent(num_actions=env.num_actions, state_shape=env.state_shape[0],
+                         mlp_layers=mlp_layers, device=torch.device('cpu'))
+    agent = CFRAgainstDQNAgent(env, player_id, dqn_agent, model_path=None, seed=seed, **agent_kwargs)
+    # The strategy is read from the mirror, the traversal updates go to agent.tables
+    agent.strategy_tables = DenseCFRTables(num_actions=env.num_actions)
+
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        num_hands, regret_updates, dqn_update = message
+        for infosets, regrets in regret_updates:
+            agent.strategy_tables.regrets[infosets] += regrets
+        if dqn_update is not None:
+            version, state_dict = dqn_update
+            dqn_agent.q_estimator.qnet.load_state_dict(state_dict)
+            dqn_agent.train_t = version
+
+        agent.tables.clear()
+        agent.run_iterations(num_hands)
+        conn.send(agent.tables.sparse_delta())
+    conn.close()
+
+
+class CFRWorkerPool:
+    """
+    Runs the CFR iterations of CFRAgainstDQNAgent in worker processes.
+
+    The hands of a run_iterations call are split over the workers. Every worker deals from
+    its own seed, traverses its hands against a frozen copy of the DQN with the strategy of
+    the master regrets at the start of the call, and returns sparse regret and average-policy
+    deltas that are merged into the master tables. Unlike the sequential loop, hands of the
+    same call do not see each other's regret updates.
+
+    Workers mirror the master regrets by applying the merged deltas of the previous call, and
+    the DQN weights are only sent when dqn_agent.train_t has changed.
+    """
+
+    def __init__(self, cfr_agent, num_workers, mlp_layers, seed, **agent_kwargs):
+        """agent_kwargs are passed to the CFRAgainstDQNAgent of every worker"""
+        self.agent = cfr_agent
+        self.num_workers = num_workers
+        self.dqn_version = None
+
+        # Start the mirrors from the current master regrets
+        infosets = np.flatnonzero(cfr_agent.tables.visited)
+        self._regret_updates = [(infosets, cfr_agent.regrets[infosets])] if len(infosets) else []
+
+        ctx = mp.get_context()
+        self.connections = []
+        self.processes = []
+        for worker_seed in np.random.SeedSequence(seed).spawn(num_workers):
+            parent_conn, child_conn = ctx.Pipe()
+            process = ctx.Process(target=_cfr_worker, daemon=True,
+                                  args=(child_conn, int(worker_seed.generate_state(1)[0]), cfr_agent.player_id,
+                                        mlp_layers, agent_kwargs))
+            process.start()
+            child_conn.close()
+            self.connections.append(parent_conn)
+            self.processes.append(process)
+
+    def _dqn_update(self):
+        dqn_agent = self.agent.opponent_agent
+        if dqn_agent.train_t == self.dqn_version:
+            return None
+        self.dqn_version = dqn_agent.train_t
+        state_dict = {k: v.cpu() for k, v in dqn_agent.q_estimator.qnet.state_dict().items()}
+        return self.dqn_version, state_dict
+
+    def run_iterations(self, num_iterations):
+        dqn_update = self._dqn_update()
+        hands = [num_iterations // self.num_workers + (i < num_iterations % self.num_workers)
+                 for i in range(self.num_workers)]
+        for conn, num_hands in zip(self.connections, hands):
+            conn.send((num_hands, self._regret_updates, dqn_update))
+
+        self._regret_updates = []
+        for conn in self.connections:
+            delta = conn.recv()
+            self.agent.tables.add_sparse_delta(delta)
+            self._regret_updates.append(delta[:2])
+        self.agent.iteration += num_iterations
+
+    def close(self):
+        for conn in self.connections:
+            conn.send(None)
+            conn.close()
+        for process in self.processes:
+            process.join()
+
+
 # === Main Training Loop ===
 def train():
+    # Imported here, so that the CFR worker processes, which import this module, do not load wandb
+    import wandb
+
+    wandb.init(project='BNAIC-simultaneous-training-100K', name='Simultaneous_DQN_CFR_52card_100K')
     set_seed(config['seed'])
 
     # Use custom environment directly
@@ -186,25 +551,49 @@ def train():
     print(f"  Device: {device}")
     print()
 
-    cfr_agent = CFRAgainstDQNAgent(env, player_id=1, opponent_agent=dqn_agent, model_path=SAVE_CFR_PATH)
+    cfr_agent_kwargs = {
+        'batch_opponent_queries': config['batch_opponent_queries'],
+        'opponent_cache_size': config['opponent_cache_size'],
+        'traversal_mode': config['traversal_mode'],
+        'exploration': config['outcome_exploration'],
+    }
+    cfr_agent = CFRAgainstDQNAgent(env, player_id=1, seed=config['seed'], opponent_agent=dqn_agent, model_path=SAVE_CFR_PATH,
+                                   **cfr_agent_kwargs)
+    vectorized_cfr, cfr_pool = None, None
+    if config['cfr_mode'] == 'vectorized':
+        vectorized_cfr = VectorizedCFR(cfr_agent, variant=config['cfr_variant'])
+    elif config['cfr_workers'] > 1:
+        cfr_pool = CFRWorkerPool(cfr_agent, config['cfr_workers'], config['mlp_layers'], config['seed'],
+                                 **cfr_agent_kwargs)
     env.set_agents([dqn_agent, CFRWrapper(cfr_agent)])
 
+    # Time spent on the CFR side, to compare the traversal modes per second
+    cfr_cpu_seconds, cfr_wall_seconds = 0.0, 0.0
     for episode in range(config['train_episodes']):
             # CFR training iterations
-            for _ in range(config['iterations_per_episode']):
-                env.reset()
-                cfr_agent.traverse_tree(np.ones(env.num_players))
-                cfr_agent.iteration += 1
+            cpu_start, wall_start = time.process_time(), time.perf_counter()
+            if vectorized_cfr is not None:
+                vectorized_cfr.run_sweeps(config['vectorized_sweeps_per_episode'])
+            elif cfr_pool is not None:
+                cfr_pool.run_iterations(config['iterations_per_episode'])
+            else:
+                cfr_agent.run_iterations(config['iterations_per_episode'])
+            cfr_cpu_seconds += time.process_time() - cpu_start
+            cfr_wall_seconds += time.perf_counter() - wall_start
 
             if episode % 1000 == 0:
-                total_regret = sum(np.sum(np.abs(r)) for r in cfr_agent.regrets.values())
+                total_regret = cfr_agent.tables.total_regret()
                 print(f"[Episode {episode:,}] CFR iterations: {cfr_agent.iteration:,}, "
-                      f"States in policy: {len(cfr_agent.average_policy):,}")
+                      f"States in policy: {cfr_agent.tables.num_visited():,}")
 
                 wandb.log({
                     "cfr_iterations": cfr_agent.iteration,
-                    "cfr_states_seen": len(cfr_agent.average_policy),
+                    "cfr_states_seen": cfr_agent.tables.num_visited(),
                     "cfr_total_regret": total_regret,
+                    "cfr_cpu_seconds": cfr_cpu_seconds,
+                    "cfr_wall_seconds": cfr_wall_seconds,
+                    "cfr_iterations_per_second": cfr_agent.iteration / max(cfr_wall_seconds, 1e-9),
+                    **cfr_agent.opponent_cache.stats(),
                     "episode": episode
                 })
 
@@ -251,6 +640,9 @@ def train():
                       f"Draws: {draw_rate:.3f} | Progress: {episode/config['train_episodes']:.1%}")
 
 
+    if cfr_pool is not None:
+        cfr_pool.close()
+
     # Save models
     torch.save(dqn_agent.q_estimator.qnet.state_dict(), SAVE_DQN_PATH)
     cfr_agent.save()
@@ -265,7 +657,7 @@ def train():
     print(f"Environment: 52-card Leduc Hold'em")
     print(f"Total episodes: {config['train_episodes']:,}")
     print(f"Total CFR iterations: {cfr_agent.iteration:,}")
-    print(f"Total states in CFR policy: {len(cfr_agent.average_policy):,}")
+    print(f"Total states in CFR policy: {cfr_agent.tables.num_visited():,}")
     print(f"DQN network size: {config['mlp_layers']}")
     print(f"Expected draw rate: 0% (deterministic judger)")
     print("=" * 70)
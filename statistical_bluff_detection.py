@@ -1,132 +1,209 @@
 import numpy as np
-from collections import defaultdict, Counter
-import json
-import pickle
-import matplotlib.pyplot as plt
-import wandb
-import os
+import random
+from collections import Counter
+
+from BNAIC_paper_files.custom_leduc_rlcard.utils import INDEX2CARD, NUM_CARDS, NO_PUBLIC_CARD, HAND_SCORES
+from BNAIC_paper_files.game_log import open_game_log, NO_CARD
+from BNAIC_paper_files.bluff_plots import Chart, check_chart_names, log_charts
+
 SEED = 42
 np.random.seed(SEED)
 random.seed(SEED)
 
-class StatisticalBluffDetector52:
-    """
-    Statistical bluff detection for 52-card Custom Leduc Hold'em
-    """
+action_id_to_name = {0: 'call', 1: 'raise', 2: 'fold', 3: 'check'}
+CALL, RAISE = 0, 1
+NUM_ACTIONS = len(action_id_to_name)
 
-    def __init__(self, rank_order={'2': 0, '3': 1, '4': 2, '5': 3, '6': 4, '7': 5, '8': 6, '9': 7,
-                                   'T': 8, 'J': 9, 'Q': 10, 'K': 11, 'A': 12},
-                 suit_order={'C': 0, 'D': 1, 'H': 2, 'S': 3}):
-        self.rank_order = rank_order
-        self.suit_order = suit_order
+# Hand strengths (card scores without the pair bonus) range over 0..51
+NUM_STRENGTHS = NUM_CARDS
 
-        # Store historical action frequencies for belief distribution
-        self.action_history = defaultdict(lambda: defaultdict(lambda: {'pairs': [], 'non_pairs': []}))
+# Contexts pc are dense ints: (public card slot * NUM_ROUNDS + betting round) * NUM_POSITIONS + position,
+# with public card slot NO_PUBLIC_CARD before the flop
+NUM_ROUNDS = 2
+NUM_POSITIONS = 2
+NUM_CONTEXTS = (NUM_CARDS + 1) * NUM_ROUNDS * NUM_POSITIONS
 
-        # Store expected utilities for EV calculation
-        self.ev_history = defaultdict(lambda: defaultdict(list))
 
-    def card_score(self, card_str):
-        """Calculate deterministic card score for 52-card deck"""
-        if len(card_str) >= 2:
-            suit = card_str[0]
-            rank = card_str[1]
-            return self.rank_order.get(rank, 0) * 4 + self.suit_order.get(suit, 0)
-        return 0
+def _merge_moments(counts, totals, m2, batch_counts, batch_totals, batch_m2):
+    """Fold batch (count, sum, M2) arrays into running ones in place, with Chan et al.'s update"""
+    merged = counts + batch_counts
+    delta = _mean(batch_totals, batch_counts) - _mean(totals, counts)
+    m2 += batch_m2 + delta * delta * counts * batch_counts / np.maximum(merged, 1)
+    counts += batch_counts
+    totals += batch_totals
 
-    def hand_strength(self, hand, public_card=None):
-        """
-        Calculate hand strength s(h).
-        Returns: (base_score, is_pair)
-        """
-        base_score = self.card_score(hand)
-        is_pair = False
 
-        if (public_card
-                and len(public_card) >= 2):
-            if hand[1] == public_card[1]:  # Pair
-                is_pair = True
+def _mean(totals, counts):
+    return totals / np.maximum(counts, 1)
 
-        return base_score, is_pair
 
-    def get_context(self, public_card=None, betting_round=0, position=0):
-        """Create a context identifier pc."""
-        pc_str = "none" if public_card is None else public_card
+class StatisticalBluffDetector52:
+    """
+    Statistical bluff detection for 52-card Custom Leduc Hold'em.
+
+    Cards are card ids and actions action ids. Hand strength statistics are kept per (context,
+    action, is_pair) and payoffs per (context, hand, action) as count / sum / M2 arrays, so the
+    memory is fixed and detectors built on separate shards of a log can be merged. Call
+    compute_beliefs() after the last update to precompute the belief tables used for detection.
+    """
+
+    def __init__(self):
+        # Hand strength moments per context, action and is_pair, for belief distribution
+        shape = (NUM_CONTEXTS, NUM_ACTIONS, 2)
+        self.strength_counts = np.zeros(shape, dtype=np.int64)
+        self.strength_totals = np.zeros(shape)
+        self.strength_m2 = np.zeros(shape)
+        # Non-pair strengths are also counted per value, for the belief distribution plot
+        self.non_pair_counts = np.zeros((NUM_CONTEXTS, NUM_ACTIONS, NUM_STRENGTHS), dtype=np.int64)
+
+        # Payoff sums per context, hand and action, for EV calculation
+        self.ev_counts = np.zeros((NUM_CONTEXTS, NUM_CARDS, NUM_ACTIONS), dtype=np.int64)
+        self.ev_totals = np.zeros((NUM_CONTEXTS, NUM_CARDS, NUM_ACTIONS))
+
+    @staticmethod
+    def card_score(card):
+        """Deterministic card score for 52-card deck: rank first, suit breaks ties"""
+        return HAND_SCORES[card]
+
+    def hand_strength(self, hand, public_card=NO_CARD):
+        """
+        Calculate hand strength s(h) of card ids, elementwise for arrays.
+        Returns: (base_score, is_pair)
+        """
+        is_pair = (public_card != NO_CARD) & (hand // 4 == public_card // 4)
+        return self.card_score(hand), is_pair
+
+    @staticmethod
+    def get_context(public_card=NO_CARD, betting_round=0, position=0):
+        """Context id pc, elementwise for arrays"""
+        public_slot = np.where(public_card == NO_CARD, NO_PUBLIC_CARD, public_card).astype(np.int64)
+        return (public_slot * NUM_ROUNDS + betting_round) * NUM_POSITIONS + position
+
+    @staticmethod
+    def context_public_card(context):
+        """Public card id of a context, NO_CARD before the flop"""
+        public_slot = context // (NUM_ROUNDS * NUM_POSITIONS)
+        return np.where(public_slot == NO_PUBLIC_CARD, NO_CARD, public_slot)
+
+    @staticmethod
+    def context_name(context):
+        """Readable context, e.g. pc:SA_round:1_pos:0"""
+        public_slot, rest = divmod(int(context), NUM_ROUNDS * NUM_POSITIONS)
+        betting_round, position = divmod(rest, NUM_POSITIONS)
+        pc_str = "none" if public_slot == NO_PUBLIC_CARD else INDEX2CARD[public_slot]
         return f"pc:{pc_str}_round:{betting_round}_pos:{position}"
 
-    def update_belief_distribution(self, context, action, hand_strength, is_pair):
-        """Update our belief distribution based on observed actions"""
-        if is_pair:
-            self.action_history[context][action]['pairs'].append(hand_strength)
-        else:
-            self.action_history[context][action]['non_pairs'].append(hand_strength)
+    def update(self, contexts, actions, hands, public_cards, payoffs):
+        """
+        Add a batch of observed actions to the belief and EV statistics.
+
+        Args:
+            contexts, actions, hands, public_cards (numpy.array): One entry per action, as ids
+            payoffs (numpy.array): Final payoff of the acting player
+        """
+        strengths, is_pair = self.hand_strength(hands, public_cards)
+        shape = self.strength_counts.shape
+        groups = np.ravel_multi_index((contexts, actions, is_pair.astype(np.int64)), shape)
+        size = self.strength_counts.size
+        batch_counts = np.bincount(groups, minlength=size)
+        batch_totals = np.bincount(groups, weights=strengths, minlength=size)
+        deviations = strengths - _mean(batch_totals, batch_counts)[groups]
+        batch_m2 = np.bincount(groups, weights=deviations * deviations, minlength=size)
+        _merge_moments(self.strength_counts, self.strength_totals, self.strength_m2,
+                       batch_counts.reshape(shape), batch_totals.reshape(shape), batch_m2.reshape(shape))
+
+        non_pair = ~is_pair
+        np.add.at(self.non_pair_counts, (contexts[non_pair], actions[non_pair], strengths[non_pair]), 1)
+
+        ev_groups = np.ravel_multi_index((contexts, hands, actions), self.ev_counts.shape)
+        self.ev_counts += np.bincount(ev_groups, minlength=self.ev_counts.size).reshape(self.ev_counts.shape)
+        self.ev_totals += np.bincount(ev_groups, weights=payoffs, minlength=self.ev_totals.size).reshape(self.ev_totals.shape)
+
+    def merge(self, other):
+        """Add the statistics of another detector, e.g. one built on another shard of the log"""
+        _merge_moments(self.strength_counts, self.strength_totals, self.strength_m2,
+                       other.strength_counts, other.strength_totals, other.strength_m2)
+        self.non_pair_counts += other.non_pair_counts
+        self.ev_counts += other.ev_counts
+        self.ev_totals += other.ev_totals
+        return self
+
+    def compute_beliefs(self):
+        """
+        Precompute the belief distribution μ(h'|a,pc) of every (context, action) and the expected
+        utilities u(h,a), as arrays indexed like the statistics.
+        """
+        counts = self.strength_counts
+        non_pairs, pairs = counts[..., 0], counts[..., 1]
+        means = _mean(self.strength_totals, counts)
+        stds = np.where(counts > 1, np.sqrt(self.strength_m2 / np.maximum(counts, 1)), 1)
+
+        self.total_samples = non_pairs + pairs
+        # Beliefs need at least 5 samples
+        self.has_beliefs = self.total_samples >= 5
+        self.pair_frequency = pairs / np.maximum(self.total_samples, 1)
+        self.non_pair_mean, self.pair_mean = means[..., 0], means[..., 1]
+        self.non_pair_std, self.pair_std = stds[..., 0], stds[..., 1]
+        self.has_pairs = pairs > 0
+
+        # Expected utilities need at least 3 samples, NaN otherwise
+        self.expected_utility = np.where(self.ev_counts >= 3, _mean(self.ev_totals, self.ev_counts), np.nan)
 
     def get_belief_distribution(self, context, action):
         """
         Get belief distribution μ(h'|a,pc) for hands that typically take action a in context pc.
         Returns separate statistics for pairs and non-pairs.
         """
-        data = self.action_history[context][action]
-
-        pairs = data['pairs']
-        non_pairs = data['non_pairs']
-
-        # Calculate pair frequency
-        total = len(pairs) + len(non_pairs)
-        if total < 5:
+        if not self.has_beliefs[context, action]:
             return None
 
-        pair_freq = len(pairs) / total
-
-        # Statistics for non-pairs
-        non_pair_mean = np.mean(non_pairs) if non_pairs else 0
-        non_pair_std = np.std(non_pairs) if len(non_pairs) > 1 else 1
-
-        # Statistics for pairs (if any)
-        pair_mean = np.mean(pairs) if pairs else 0
-        pair_std = np.std(pairs) if len(pairs) > 1 else 1
-
         return {
-            'total_samples': total,
-            'pair_frequency': pair_freq,
-            'non_pair_mean': non_pair_mean,
-            'non_pair_std': non_pair_std,
-            'pair_mean': pair_mean,
-            'pair_std': pair_std,
-            'has_pairs': len(pairs) > 0
+            'total_samples': int(self.total_samples[context, action]),
+            'pair_frequency': float(self.pair_frequency[context, action]),
+            'non_pair_mean': float(self.non_pair_mean[context, action]),
+            'non_pair_std': float(self.non_pair_std[context, action]),
+            'pair_mean': float(self.pair_mean[context, action]),
+            'pair_std': float(self.pair_std[context, action]),
+            'has_pairs': bool(self.has_pairs[context, action])
         }
 
-    def update_ev(self, context, hand, action, payoff):
-        """Update expected value history"""
-        key = (hand, action)
-        self.ev_history[context][key].append(payoff)
-
     def get_expected_utility(self, context, hand, action):
         """Get expected utility u(h,a) based on historical data"""
-        key = (hand, action)
-        payoffs = self.ev_history[context].get(key, [])
+        utility = self.expected_utility[context, hand, action]
+        return None if np.isnan(utility) else float(utility)
 
-        if len(payoffs) < 3:
-            return None
+    def statistical_bluff_mask(self, hands, contexts, passive_action=CALL, std_threshold=0.5):
+        """
+        Vectorized is_statistical_bluff for raises: which of the raises with the given hands in
+        the given contexts are statistical bluffs.
+        """
+        strengths, is_pair = self.hand_strength(hands, self.context_public_card(contexts))
+
+        # Condition 1: the hand misrepresents, i.e. is weaker than the hands that typically raise
+        pair_threshold = self.pair_mean[contexts, RAISE] - std_threshold * self.pair_std[contexts, RAISE]
+        non_pair_threshold = self.non_pair_mean[contexts, RAISE] - std_threshold * self.non_pair_std[contexts, RAISE]
+        misrepresents = np.where(is_pair,
+                                 self.has_pairs[contexts, RAISE] & (strengths < pair_threshold),
+                                 (self.pair_frequency[contexts, RAISE] > 0.7) | (strengths < non_pair_threshold))
+
+        # Condition 2: raising has a higher EV than the passive action, when both EVs are known
+        ev_aggressive = self.expected_utility[contexts, hands, RAISE]
+        ev_passive = self.expected_utility[contexts, hands, passive_action]
+        ev_unknown = np.isnan(ev_aggressive) | np.isnan(ev_passive)
+        ev_positive = ev_aggressive > ev_passive
 
-        return np.mean(payoffs)
+        return self.has_beliefs[contexts, RAISE] & misrepresents & (ev_unknown | ev_positive)
 
-    def is_statistical_bluff(self, hand, action, context, passive_action='call', std_threshold=0.5):
+    def is_statistical_bluff(self, hand, action, context, passive_action=CALL, std_threshold=0.5):
         """
         Determine if an action is a bluff based on the statistical definition.
         """
         # Only raises can be bluffs in our simplified model
-        if action != 'raise':
+        if action != RAISE:
             return False, {}
 
-        # Calculate hand strength
-        public_card = None
-        if 'pc:' in context:
-            pc_part = context.split('_')[0].replace('pc:', '')
-            if pc_part != 'none':
-                public_card = pc_part
-
-        h_strength, h_is_pair = self.hand_strength(hand, public_card)
+        h_strength, h_is_pair = self.hand_strength(hand, self.context_public_card(context))
+        h_strength, h_is_pair = int(h_strength), bool(h_is_pair)
 
         # Get belief distribution for this action in this context
         belief_stats = self.get_belief_distribution(context, action)
@@ -199,63 +276,131 @@ class StatisticalBluffDetector52:
         return is_bluff, details
 
 
-def create_belief_distribution_visualization(detector, player_name):
-    """Create simple belief distribution visualization"""
+def belief_distribution_chart(detector, player_name):
+    """Belief distribution Chart of the context with the most raises, None if it has fewer than 20"""
 
     # Find the most active context
-    best_context = None
-    max_raises = 0
+    raise_counts = detector.strength_counts[:, RAISE, :].sum(axis=1)
+    best_context = int(np.argmax(raise_counts))
+    max_raises = raise_counts[best_context]
 
-    for context, actions in detector.action_history.items():
-        if 'raise' in actions:
-            raise_data = actions['raise']
-            total = len(raise_data['pairs']) + len(raise_data['non_pairs'])
-            if total > max_raises:
-                max_raises = total
-                best_context = context
-
-    if not best_context or max_raises < 20:
-        return
+    if max_raises < 20:
+        return None
 
     # Get the raise data
-    raise_data = detector.action_history[best_context]['raise']
-    pair_count = len(raise_data['pairs'])
-    non_pair_count = len(raise_data['non_pairs'])
+    non_pair_count, pair_count = detector.strength_counts[best_context, RAISE].tolist()
+    non_pair_histogram = detector.non_pair_counts[best_context, RAISE]
 
-    print(f"Selected context: {best_context}")
+    print(f"Selected context: {detector.context_name(best_context)}")
     print(f"Pairs: {pair_count}, Non-pairs: {non_pair_count}")
 
-    # Create visualization
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
+    return Chart('belief_distribution', f'{player_name} Belief Distribution', 'belief_distribution',
+                 (player_name, pair_count, non_pair_count, non_pair_histogram))
+
+# One record per raise, kept by StatisticalModel for the detection pass
+RAISE_DTYPE = np.dtype([
+    ('player', np.int8),
+    ('hand', np.int8),
+    ('context', np.int16),        # Context id pc of the raise
+    ('payoff', np.float32),       # Final payoff of the raiser
+    ('reaction', np.int8),        # Next action of the opponent, -1 if there is none
+    ('reaction_round', np.int8),  # Round of that action
+])
 
-    # Pie chart
-    ax1.pie([pair_count, non_pair_count], labels=['Pairs', 'Non-pairs'], autopct='%1.1f%%',
-            colors=['gold', 'lightblue'])
-    ax1.set_title(f'{player_name}: Pair vs Non-pair Raises')
 
-    # Histogram
-    if raise_data['non_pairs']:
-        ax2.hist(raise_data['non_pairs'], bins=range(0, 53, 2), alpha=0.7, color='lightblue', edgecolor='black')
-        ax2.set_xlabel('Hand Strength')
-        ax2.set_ylabel('Count')
-        ax2.set_title(f'{player_name}: Non-pair Strength Distribution')
-        ax2.grid(True, alpha=0.3)
+class StatisticalModel:
+    """
+    Belief and EV statistics of both players, plus the raise index of the detection pass.
+
+    Games are added in any number of parts, each covering whole games: chunks of a log
+    (build_statistical_model) or batches of an evaluation that is still running (see
+    online_bluff_analytics.py). Call finish() after the last part, before detecting bluffs.
+    """
 
-    plt.tight_layout()
-    wandb.log({f'{player_name} Belief Distribution': wandb.Image(plt)})
-    plt.close()
+    def __init__(self):
+        self.detector = StatisticalBluffDetector52()
+        self.raises = np.zeros(0, dtype=RAISE_DTYPE)
+        self.total_games = 0
+        self.actions_per_player = np.zeros(2, dtype=np.int64)
+        self._raises = []
 
-def analyze_statistical_bluffs_52card(log_path, player_id=0, player_name="DQN"):
+    def add_steps(self, columns, start, end, num_games):
+        """
+        Add the steps start:end of a game_log.StepColumns, which hold num_games whole games.
+        The detector gets the belief and EV statistics of every action (of both players, as the
+        detection of either player needs them) and each raise goes, with the opponent's
+        reaction, into the compact RAISE_DTYPE index.
+        """
+        players = columns.player[start:end]
+        actions = columns.action[start:end]
+        hands = columns.hand[start:end]
+        public_cards = columns.public_card[start:end]
+        payoffs = columns.payoff[start:end]
+        contexts = self.detector.get_context(public_cards, columns.round[start:end], players)
+        # EVs use the final payoff of the acting player
+        self.detector.update(contexts, actions, hands, public_cards, payoffs)
+
+        # Raises, with the next action of the opponent
+        raise_steps = np.flatnonzero(actions == RAISE)
+        raises = np.zeros(len(raise_steps), dtype=RAISE_DTYPE)
+        raises['player'] = players[raise_steps]
+        raises['hand'] = hands[raise_steps]
+        raises['context'] = contexts[raise_steps]
+        raises['payoff'] = payoffs[raise_steps]
+        raises['reaction'], raises['reaction_round'] = columns.reactions(start + raise_steps)
+        self._raises.append(raises)
+
+        self.total_games += num_games
+        self.actions_per_player += np.bincount(players, minlength=2)
+
+    def add_log(self, log):
+        """Add all games of a game log, e.g. one GameLog.game_range of a large log"""
+        self.add_steps(log.columns(), 0, len(log.steps), len(log))
+
+    def merge(self, other):
+        """Add the games of another model, e.g. of a later evaluation shard"""
+        self.detector.merge(other.detector)
+        self._raises += [other.raises] + other._raises
+        self.total_games += other.total_games
+        self.actions_per_player += other.actions_per_player
+
+    def finish(self):
+        """Precompute the beliefs and collect the raise index; returns the model"""
+        self.detector.compute_beliefs()
+        self.raises = np.concatenate([self.raises] + self._raises)
+        self._raises = []
+        return self
+
+
+def build_statistical_model(log, chunk_games=100_000):
     """
-    Analyze statistical bluffs for 52-card version with comparable output to threshold analysis
+    Single streaming pass over a game log into a StatisticalModel. The step columns are built
+    for chunk_games games at a time (GameLog.game_range), so apart from the raise index the
+    memory does not grow with the log.
     """
-    detector = StatisticalBluffDetector52()
+    model = StatisticalModel()
+
+    print("Pass 1: Building belief distributions...")
+    for first in range(0, len(log), chunk_games):
+        model.add_log(log.game_range(first, min(first + chunk_games, len(log))))
 
-    print(f"=== Building Statistical Model for {player_name} ===")
+    return model.finish()
+
+
+def analyze_statistical_bluffs_52card(log_path, player_id=0, player_name="DQN", model=None):
+    """
+    Analyze statistical bluffs for 52-card version with comparable output to threshold analysis.
+    log_path is a binary game log directory or a JSONL log of all games (see game_log.open_game_log).
+    A model from build_statistical_model can be passed to reuse its pass over the log.
+    """
+    if model is None:
+        print(f"=== Building Statistical Model for {player_name} ===")
+        model = build_statistical_model(open_game_log(log_path))
+    detector = model.detector
 
     # Initialize tracking similar to threshold analysis
-    total_games = 0
-    player_total_actions = 0
+    total_games = model.total_games
+    player_total_actions = int(model.actions_per_player[player_id])
     total_statistical_bluff_attempts = 0
     total_statistical_bluff_successes = 0
 
@@ -284,8 +429,6 @@ def analyze_statistical_bluffs_52card(log_path, player_id=0, player_name="DQN"):
     statistical_reactions_before_public = Counter()
     statistical_reactions_after_public = Counter()
 
-    action_id_to_name = {0: 'call', 1: 'raise', 2: 'fold', 3: 'check'}
-
     def get_rank_group(hand):
         if len(hand) >= 2:
             rank = hand[1]
@@ -306,139 +449,59 @@ def analyze_statistical_bluffs_52card(log_path, player_id=0, player_name="DQN"):
             return f"{rank}{suit}"
         return hand
 
-    # First pass: Build belief distributions and EV data
-    print("Pass 1: Building belief distributions...")
-    with open(log_path, 'r') as f:
-        for line in f:
-            data = json.loads(line)
-            log = data['log']
-            payoffs = data['payoffs']
-            total_games += 1
-
-            # Track game state
-            game_states = {}
-            betting_round = 0
-
-            for i, entry in enumerate(log):
-                pid = entry['player_id']
-                hand = entry.get('hand', '')
-                action = entry.get('action_taken', -1)
-                public_card = entry.get('public_card')
-
-                # Update betting round
-                if public_card and betting_round == 0:
-                    betting_round = 1
-
-                # Map action index to name
-                action_name = action_id_to_name.get(action, 'unknown')
-
-                if hand and action_name != 'unknown':
-                    # Create context
-                    position = pid
-                    context = detector.get_context(public_card, betting_round, position)
-
-                    # Calculate hand strength
-                    strength, is_pair = detector.hand_strength(hand, public_card)
-
-                    # Update belief distribution
-                    detector.update_belief_distribution(context, action_name, strength, is_pair)
-
-                    # Store for EV calculation
-                    if pid not in game_states:
-                        game_states[pid] = {'hand': hand, 'actions': []}
-                    game_states[pid]['actions'].append((context, action_name))
-
-            # Update EVs based on final payoffs
-            for pid, state in game_states.items():
-                for context, action in state['actions']:
-                    detector.update_ev(context, state['hand'], action, payoffs[pid])
-
-    # Second pass: Detect statistical bluffs
+    # Second pass: Detect statistical bluffs among the player's raises
     print("Pass 2: Detecting statistical bluffs...")
-    with open(log_path, 'r') as f:
-        for game_num, line in enumerate(f):
-            data = json.loads(line)
-            log = data['log']
-            payoffs = data['payoffs']
-            betting_round = 0
-
-            for i, entry in enumerate(log):
-                pid = entry['player_id']
-
-                if pid == player_id:
-                    player_total_actions += 1
-
-                    hand = entry.get('hand', '')
-                    action = entry.get('action_taken', -1)
-                    public_card = entry.get('public_card')
-
-                    if public_card and betting_round == 0:
-                        betting_round = 1
-
-                    action_name = action_id_to_name.get(action, 'unknown')
-
-                    if action_name == 'raise' and hand:
-                        # Check if it's a statistical bluff
-                        context = detector.get_context(public_card, betting_round, pid)
-                        is_bluff, details = detector.is_statistical_bluff(hand, action_name, context)
-
-                        if is_bluff:
-                            total_statistical_bluff_attempts += 1
-
-                            # Track attempt details
-                            hand_cat = get_hand_category(hand)
-                            rank_group = get_rank_group(hand)
-
-                            statistical_bluff_attempts_by_hand[hand_cat] += 1
-                            statistical_bluff_attempts_by_rank[hand[1]] += 1
-                            statistical_bluff_attempts_by_rank_group[rank_group] += 1
-
-                            # Look for opponent's reaction
-                            opponent_reaction = None
-                            opponent_action_index = None
-                            reaction_context = None
-
-                            for j in range(i + 1, len(log)):
-                                next_entry = log[j]
-                                if next_entry['player_id'] != player_id:  # Opponent's turn
-                                    opponent_action_index = next_entry.get('action_taken', -1)
-                                    opponent_reaction = action_id_to_name.get(opponent_action_index, 'UNKNOWN')
-                                    reaction_context = next_entry.get('public_card', None)
-                                    break
-
-                            # Track reaction and determine success
-                            if opponent_reaction and opponent_reaction != 'UNKNOWN':
-                                opponent_reactions_to_statistical_bluffs[opponent_reaction] += 1
-
-                                # Context tracking
-                                if reaction_context:
-                                    statistical_reactions_after_public[opponent_reaction] += 1
-                                else:
-                                    statistical_reactions_before_public[opponent_reaction] += 1
-
-                                # Determine outcome
-                                if opponent_reaction == 'fold':
-                                    # STATISTICAL BLUFF SUCCESS!
-                                    total_statistical_bluff_successes += 1
-                                    statistical_bluff_outcomes['opponent_folded'] += 1
-
-                                    # Track successful bluff by hand
-                                    statistical_bluff_successes_by_hand[hand_cat] += 1
-                                    statistical_bluff_successes_by_rank[hand[1]] += 1
-                                    statistical_bluff_successes_by_rank_group[rank_group] += 1
-
-                                elif opponent_reaction == 'call':
-                                    statistical_bluff_outcomes['opponent_called'] += 1
-                                    # Check final showdown result
-                                    if payoffs[player_id] > 0:
-                                        statistical_bluff_outcomes['showdown_won'] += 1
-                                    else:
-                                        statistical_bluff_outcomes['showdown_lost'] += 1
-
-                                elif opponent_reaction == 'raise':
-                                    statistical_bluff_outcomes['opponent_raised'] += 1
-                                elif opponent_reaction == 'check':
-                                    statistical_bluff_outcomes['opponent_checked'] += 1
+    raises = model.raises[model.raises['player'] == player_id]
+    bluffs = raises[detector.statistical_bluff_mask(raises['hand'], raises['context'])]
+    for card_id, payoff, reaction, reaction_round in zip(
+            *(bluffs[field].tolist() for field in ('hand', 'payoff', 'reaction', 'reaction_round'))):
+        hand = INDEX2CARD[card_id]
+        total_statistical_bluff_attempts += 1
+
+        # Track attempt details
+        hand_cat = get_hand_category(hand)
+        rank_group = get_rank_group(hand)
+
+        statistical_bluff_attempts_by_hand[hand_cat] += 1
+        statistical_bluff_attempts_by_rank[hand[1]] += 1
+        statistical_bluff_attempts_by_rank_group[rank_group] += 1
+
+        # Opponent's reaction, from the raise index
+        opponent_reaction = action_id_to_name.get(reaction)
+
+        # Track reaction and determine success
+        if opponent_reaction:
+            opponent_reactions_to_statistical_bluffs[opponent_reaction] += 1
+
+            # Context tracking
+            if reaction_round > 0:
+                statistical_reactions_after_public[opponent_reaction] += 1
+            else:
+                statistical_reactions_before_public[opponent_reaction] += 1
+
+            # Determine outcome
+            if opponent_reaction == 'fold':
+                # STATISTICAL BLUFF SUCCESS!
+                total_statistical_bluff_successes += 1
+                statistical_bluff_outcomes['opponent_folded'] += 1
+
+                # Track successful bluff by hand
+                statistical_bluff_successes_by_hand[hand_cat] += 1
+                statistical_bluff_successes_by_rank[hand[1]] += 1
+                statistical_bluff_successes_by_rank_group[rank_group] += 1
+
+            elif opponent_reaction == 'call':
+                statistical_bluff_outcomes['opponent_called'] += 1
+                # Check final showdown result
+                if payoff > 0:
+                    statistical_bluff_outcomes['showdown_won'] += 1
+                else:
+                    statistical_bluff_outcomes['showdown_lost'] += 1
+
+            elif opponent_reaction == 'raise':
+                statistical_bluff_outcomes['opponent_raised'] += 1
+            elif opponent_reaction == 'check':
+                statistical_bluff_outcomes['opponent_checked'] += 1
 
     # Calculate metrics
     statistical_bluff_attempt_rate = total_statistical_bluff_attempts / player_total_actions if player_total_actions > 0 else 0
@@ -478,11 +541,11 @@ def analyze_statistical_bluffs_52card(log_path, player_id=0, player_name="DQN"):
 
     print(f"\n=== SUCCESS BREAKDOWN ===")
     print(
-        f"  Immediate successes (opponent folded): {immediate_successes}/{total_statistical_bluff_attempts} ({immediate_successes / total_statistical_bluff_attempts * 100:.1f}%)")
+        f"  Immediate successes (opponent folded): {immediate_successes}/{total_statistical_bluff_attempts} ({(immediate_successes / total_statistical_bluff_attempts * 100 if total_statistical_bluff_attempts > 0 else 0):.1f}%)")
     print(
-        f"  Lucky wins (called but won): {lucky_wins}/{total_statistical_bluff_attempts} ({lucky_wins / total_statistical_bluff_attempts * 100:.1f}%)")
+        f"  Lucky wins (called but won): {lucky_wins}/{total_statistical_bluff_attempts} ({(lucky_wins / total_statistical_bluff_attempts * 100 if total_statistical_bluff_attempts > 0 else 0):.1f}%)")
     print(
-        f"  Total positive outcomes: {total_positive_outcomes}/{total_statistical_bluff_attempts} ({total_positive_outcomes / total_statistical_bluff_attempts * 100:.1f}%)")
+        f"  Total positive outcomes: {total_positive_outcomes}/{total_statistical_bluff_attempts} ({(total_positive_outcomes / total_statistical_bluff_attempts * 100 if total_statistical_bluff_attempts > 0 else 0):.1f}%)")
 
     print(f"\n=== STATISTICAL BLUFF ATTEMPTS BY RANK GROUP ===")
     for group, count in statistical_bluff_attempts_by_rank_group.most_common():
@@ -527,92 +590,63 @@ def analyze_statistical_bluffs_52card(log_path, player_id=0, player_name="DQN"):
     }
 
 
-def create_comparable_visualizations(data, player_name, project_name='BNAIC-statistical-bluff-analysis-52card'):
-    """Create visualizations comparable to threshold analysis"""
-
-    wandb.init(project=project_name, name=f'{player_name}_Statistical_Bluff_Analysis_52Card')
-
-    create_belief_distribution_visualization(data['detector'], player_name)
-
-    def plot_bar(data_dict, title, xlabel, ylabel, color='red', figsize=(10, 6)):
-        if not data_dict:
-            print(f"No data to plot for: {title}")
-            return
-
-        sorted_items = sorted(data_dict.items(), key=lambda x: x[1], reverse=True)[:15]  # Top 15
-        keys, values = zip(*sorted_items) if sorted_items else ([], [])
-
-        plt.figure(figsize=figsize)
-        bars = plt.bar(keys, values, color=color, alpha=0.7, edgecolor='black')
-
-        for bar, value in zip(bars, values):
-            plt.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 0.01,
-                     f'{value}', ha='center', va='bottom', fontsize=8)
+def statistical_charts(data, player_name):
+    """Charts of one analyze_statistical_bluffs_52card result, comparable to the threshold analysis"""
+    charts = []
+    belief_chart = belief_distribution_chart(data['detector'], player_name)
+    if belief_chart is not None:
+        charts.append(belief_chart)
 
-        plt.title(title, fontsize=14, fontweight='bold')
-        plt.xlabel(xlabel, fontsize=12)
-        plt.ylabel(ylabel, fontsize=12)
-        plt.xticks(rotation=45, ha='right')
-        plt.grid(axis='y', alpha=0.3)
-        plt.tight_layout()
-        wandb.log({title: wandb.Image(plt)})
-        plt.close()
+    def bar(name, data_dict, title, xlabel, ylabel, color):
+        if data_dict:
+            charts.append(Chart(name, title, 'bar', (data_dict, xlabel, ylabel, color)))
 
     # Determine opponent name and color for reaction charts
     opponent_name = "CFR" if player_name == "DQN" else "DQN"
     reaction_color = "red" if opponent_name == "CFR" else "blue"
 
     # 1. Opponent reactions to statistical bluff attempts
-    if data['opponent_reactions_to_statistical_bluffs']:
-        plot_bar(data['opponent_reactions_to_statistical_bluffs'],
-                 f'{opponent_name} Reactions to {player_name} Bluff Attempts (Statistics-based)',
-                 f'{opponent_name} Action', 'Count', color=reaction_color)
+    bar('opponent_reactions', data['opponent_reactions_to_statistical_bluffs'],
+        f'{opponent_name} Reactions to {player_name} Bluff Attempts (Statistics-based)',
+        f'{opponent_name} Action', 'Count', reaction_color)
 
     # 2. Pre/Post flop context
-    if data['statistical_reactions_before_public']:
-        plot_bar(data['statistical_reactions_before_public'],
-                 f'{opponent_name} Reactions to {player_name} Bluff Attempts - Pre-flop (Statistics-based)',
-                 f'{opponent_name} Action', 'Count', color=reaction_color)
-    if data['statistical_reactions_after_public']:
-        plot_bar(data['statistical_reactions_after_public'],
-                 f'{opponent_name} Reactions to {player_name} Bluff Attempts - Post-flop (Statistics-based)',
-                 f'{opponent_name} Action', 'Count', color=reaction_color)
+    bar('reactions_before_public', data['statistical_reactions_before_public'],
+        f'{opponent_name} Reactions to {player_name} Bluff Attempts - Pre-flop (Statistics-based)',
+        f'{opponent_name} Action', 'Count', reaction_color)
+    bar('reactions_after_public', data['statistical_reactions_after_public'],
+        f'{opponent_name} Reactions to {player_name} Bluff Attempts - Post-flop (Statistics-based)',
+        f'{opponent_name} Action', 'Count', reaction_color)
 
     # 3. Statistical bluff attempts by rank
-    if data['statistical_bluff_attempts_by_rank']:
-        plot_bar(data['statistical_bluff_attempts_by_rank'],
-                 f'{player_name} Statistical Bluff ATTEMPTS by Card Rank',
-                 'Rank', 'Attempt Count', color='red')
+    bar('attempts_by_rank', data['statistical_bluff_attempts_by_rank'],
+        f'{player_name} Statistical Bluff ATTEMPTS by Card Rank',
+        'Rank', 'Attempt Count', 'red')
 
     # 4. Statistical bluff successes by rank
-    if data['statistical_bluff_successes_by_rank']:
-        plot_bar(data['statistical_bluff_successes_by_rank'],
-                 f'{player_name} Statistical Bluff SUCCESSES by Card Rank',
-                 'Rank', 'Success Count', color='green')
+    bar('successes_by_rank', data['statistical_bluff_successes_by_rank'],
+        f'{player_name} Statistical Bluff SUCCESSES by Card Rank',
+        'Rank', 'Success Count', 'green')
 
     # 5. Statistical bluff attempts by rank group
-    if data['statistical_bluff_attempts_by_rank_group']:
-        plot_bar(data['statistical_bluff_attempts_by_rank_group'],
-                 f'{player_name} Statistical Bluff ATTEMPTS by Rank Group',
-                 'Rank Group', 'Attempt Count', color='darkred')
+    bar('attempts_by_rank_group', data['statistical_bluff_attempts_by_rank_group'],
+        f'{player_name} Statistical Bluff ATTEMPTS by Rank Group',
+        'Rank Group', 'Attempt Count', 'darkred')
 
     # 6. Statistical bluff successes by rank group
-    if data['statistical_bluff_successes_by_rank_group']:
-        plot_bar(data['statistical_bluff_successes_by_rank_group'],
-                 f'{player_name} Statistical Bluff SUCCESSES by Rank Group',
-                 'Rank Group', 'Success Count', color='darkgreen')
+    bar('successes_by_rank_group', data['statistical_bluff_successes_by_rank_group'],
+        f'{player_name} Statistical Bluff SUCCESSES by Rank Group',
+        'Rank Group', 'Success Count', 'darkgreen')
 
     # 7. Most attempted statistical bluff hands
-    if data['statistical_bluff_attempts_by_hand']:
-        plot_bar(data['statistical_bluff_attempts_by_hand'],
-                 f'Top 15 {player_name} Statistical Bluff ATTEMPT Hands',
-                 'Hand', 'Attempt Count', color='red')
+    bar('attempts_by_hand', data['statistical_bluff_attempts_by_hand'],
+        f'Top 15 {player_name} Statistical Bluff ATTEMPT Hands',
+        'Hand', 'Attempt Count', 'red')
 
     # 8. Most successful statistical bluff hands
-    if data['statistical_bluff_successes_by_hand']:
-        plot_bar(data['statistical_bluff_successes_by_hand'],
-                 f'Top 15 {player_name} Statistical Bluff SUCCESS Hands',
-                 'Hand', 'Success Count', color='green')
+    bar('successes_by_hand', data['statistical_bluff_successes_by_hand'],
+        f'Top 15 {player_name} Statistical Bluff SUCCESS Hands',
+        'Hand', 'Success Count', 'green')
 
     # 9. Success rate by hand (only for hands with multiple attempts)
     success_rates_by_hand = {}
@@ -622,33 +656,14 @@ def create_comparable_visualizations(data, player_name, project_name='BNAIC-stat
         if attempts >= 3:  # Only show hands with at least 3 attempts
             success_rates_by_hand[hand] = successes / attempts
 
-    if success_rates_by_hand:
-        plot_bar(success_rates_by_hand,
-                 f'{player_name} Statistical Bluff Success Rate by Hand (min 3 attempts)',
-                 'Hand', 'Success Rate', color='purple')
+    bar('success_rate_by_hand', success_rates_by_hand,
+        f'{player_name} Statistical Bluff Success Rate by Hand (min 3 attempts)',
+        'Hand', 'Success Rate', 'purple')
 
     # 10. Statistical bluff attempt outcomes distribution
     if data['statistical_bluff_outcomes'] and sum(data['statistical_bluff_outcomes'].values()) > 0:
-        outcomes = list(data['statistical_bluff_outcomes'].keys())
-        counts = list(data['statistical_bluff_outcomes'].values())
-
-        plt.figure(figsize=(12, 6))
-        colors = ['green', 'orange', 'red', 'gray', 'lightgreen', 'pink']
-        bars = plt.bar(outcomes, counts, color=colors, alpha=0.7, edgecolor='black')
-
-        for bar, count in zip(bars, counts):
-            if count > 0:
-                plt.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 0.5,
-                         f'{count}', ha='center', va='bottom')
-
-        plt.title(f'{player_name} Statistical Bluff Attempt Outcomes Distribution', fontsize=14, fontweight='bold')
-        plt.xlabel('Outcome', fontsize=12)
-        plt.ylabel('Count', fontsize=12)
-        plt.xticks(rotation=45, ha='right')
-        plt.grid(axis='y', alpha=0.3)
-        plt.tight_layout()
-        wandb.log({f'{player_name} Statistical Bluff Attempt Outcomes Distribution': wandb.Image(plt)})
-        plt.close()
+        charts.append(Chart('attempt_outcomes', f'{player_name} Statistical Bluff Attempt Outcomes Distribution',
+                            'outcomes', (data['statistical_bluff_outcomes'],)))
 
     # 11. Success rate comparison by rank
     if data['statistical_bluff_attempts_by_rank'] and data['statistical_bluff_successes_by_rank']:
@@ -657,26 +672,16 @@ def create_comparable_visualizations(data, player_name, project_name='BNAIC-stat
         ranks = [rank for rank in all_possible_ranks if rank in data['statistical_bluff_attempts_by_rank']]
         attempts = [data['statistical_bluff_attempts_by_rank'].get(rank, 0) for rank in ranks]
         successes = [data['statistical_bluff_successes_by_rank'].get(rank, 0) for rank in ranks]
+        charts.append(Chart('attempts_vs_successes_by_rank',
+                            f'{player_name} Statistical Bluff Attempts vs Successes by Rank',
+                            'attempts_vs_successes', (ranks, attempts, successes)))
 
-        plt.figure(figsize=(12, 6))
-        x = range(len(ranks))
-        width = 0.35
+    return charts
 
-        bars1 = plt.bar([i - width / 2 for i in x], attempts, width, label='Attempts', color='red', alpha=0.7)
-        bars2 = plt.bar([i + width / 2 for i in x], successes, width, label='Successes', color='green', alpha=0.7)
 
-        plt.title(f'{player_name} Statistical Bluff Attempts vs Successes by Rank', fontsize=14, fontweight='bold')
-        plt.xlabel('Rank', fontsize=12)
-        plt.ylabel('Count', fontsize=12)
-        plt.xticks(x, ranks)
-        plt.legend()
-        plt.grid(axis='y', alpha=0.3)
-        plt.tight_layout()
-        wandb.log({f'{player_name} Statistical Bluff Attempts vs Successes by Rank': wandb.Image(plt)})
-        plt.close()
-
-    # Log summary stats to W&B
-    summary_stats = {
+def statistical_summary_stats(data, player_name):
+    """Summary metrics of one analyze_statistical_bluffs_52card result, as logged to W&B"""
+    return {
         'Total Games': data['total_games'],
         f'{player_name} Total Actions': data['player_total_actions'],
         'Total Statistical Bluff Attempts': data['total_statistical_bluff_attempts'],
@@ -691,6 +696,22 @@ def create_comparable_visualizations(data, player_name, project_name='BNAIC-stat
                                              3) if data['total_statistical_bluff_attempts'] > 0 else 0,
     }
 
+
+def create_comparable_visualizations(data, player_name, project_name='BNAIC-statistical-bluff-analysis-52card',
+                                     charts=None, workers=0):
+    """
+    Log the charts named in charts (all by default, none for []; see bluff_plots.log_charts) and
+    the summary metrics of one analysis to a new W&B run
+    """
+    check_chart_names(charts)
+    import wandb
+
+    wandb.init(project=project_name, name=f'{player_name}_Statistical_Bluff_Analysis_52Card')
+
+    log_charts(statistical_charts(data, player_name), charts, workers)
+
+    # Log summary stats to W&B
+    summary_stats = statistical_summary_stats(data, player_name)
     wandb.log(summary_stats)
     wandb.finish()
 
@@ -699,31 +720,51 @@ def create_comparable_visualizations(data, player_name, project_name='BNAIC-stat
         print(f"{key}: {value}")
 
 
-def run_statistical_analysis_both_players(log_path):
-    """Run statistical bluff analysis for both players"""
+def run_statistical_analysis_both_players(log_path, charts=None, plot_workers=0, log_to_wandb=True):
+    """
+    Run statistical bluff analysis for both players, sharing one pass over the log. charts and
+    plot_workers select and render the W&B charts, see create_comparable_visualizations; without
+    log_to_wandb only the reports are printed and neither wandb nor matplotlib is imported.
+    """
+
+    check_chart_names(charts)
+
+    print("=" * 80)
+    print("Building Statistical Model for both players")
+    print("=" * 80)
+    model = build_statistical_model(open_game_log(log_path))
 
     # Analyze DQN (Player 0)
     print("=" * 80)
     print("ANALYZING DQN (Player 0) - Statistical Bluffs")
     print("=" * 80)
-    dqn_data = analyze_statistical_bluffs_52card(log_path, player_id=0, player_name="DQN")
-    create_comparable_visualizations(dqn_data, "DQN")
+    dqn_data = analyze_statistical_bluffs_52card(log_path, player_id=0, player_name="DQN", model=model)
+    if log_to_wandb:
+        create_comparable_visualizations(dqn_data, "DQN", charts=charts, workers=plot_workers)
 
     # Analyze CFR (Player 1)
     print("\n" + "=" * 80)
     print("ANALYZING CFR (Player 1) - Statistical Bluffs")
     print("=" * 80)
-    cfr_data = analyze_statistical_bluffs_52card(log_path, player_id=1, player_name="CFR")
-    create_comparable_visualizations(cfr_data, "CFR")
+    cfr_data = analyze_statistical_bluffs_52card(log_path, player_id=1, player_name="CFR", model=model)
+    if log_to_wandb:
+        create_comparable_visualizations(cfr_data, "CFR", charts=charts, workers=plot_workers)
 
     return dqn_data, cfr_data
 
 
 # Main execution
 if __name__ == "__main__":
-    log_path = r'C:\Users\zaket\PycharmProjects\Thesis\BNAIC_paper_results\simultaneous_Evaluation_100K\evaluation_game_logs_all_100K.jsonl'
+    # Names of the charts to log (see bluff_plots.CHART_NAMES), None for all, [] for the numbers only
+    charts = None
+    # >0 renders the charts in a process pool of that size
+    plot_workers = 0
+    # False only prints the reports
+    log_to_wandb = True
+
+    log_path = r'C:\Users\zaket\PycharmProjects\Thesis\BNAIC_paper_results\simultaneous_Evaluation_100K\evaluation_game_log_100K'
 
-    dqn_results, cfr_results = run_statistical_analysis_both_players(log_path)
+    dqn_results, cfr_results = run_statistical_analysis_both_players(log_path, charts, plot_workers, log_to_wandb)
 
     print("\n" + "=" * 80)
     print("STATISTICAL BLUFF ANALYSIS COMPLETE")
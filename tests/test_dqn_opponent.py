@@ -0,0 +1,49 @@
+import numpy as np
+
+from BNAIC_paper_files.custom_leduc_rlcard.leducholdem import LeducholdemEnv
+from BNAIC_paper_files.simultaneous_training import CFRAgainstDQNAgent
+
+
+class StubQEstimator:
+    """Fixed random linear Q-function, no torch needed"""
+
+    def __init__(self):
+        self.weights = np.random.RandomState(0).randn(156, 4)
+
+    def predict_nograd(self, obs):
+        return obs @ self.weights
+
+
+class StubDQN:
+    def __init__(self):
+        self.train_t = 0
+        self.q_estimator = StubQEstimator()
+
+
+def run_cfr(num_hands, batch, cache_size):
+    env = LeducholdemEnv(config={'seed': 0, 'allow_step_back': True})
+    agent = CFRAgainstDQNAgent(env, 1, StubDQN(), model_path=None, batch_opponent_queries=batch,
+                               opponent_cache_size=cache_size, seed=0)
+    agent.run_iterations(num_hands)
+    return agent
+
+
+def test_batched_traversal_with_small_cache_terminates():
+    reference = run_cfr(50, batch=True, cache_size=None)
+    bounded = run_cfr(50, batch=True, cache_size=5)
+
+    # One forward pass per discovery sweep, as without a bound
+    assert bounded.opponent_cache.forward_passes == reference.opponent_cache.forward_passes
+    assert len(bounded.opponent_cache.actions) == 5
+    for name in ('regrets', 'average_policy', 'visited'):
+        assert np.array_equal(getattr(bounded.tables, name), getattr(reference.tables, name))
+
+
+def test_hit_counts_match_per_hand_traversal():
+    per_hand = run_cfr(50, batch=False, cache_size=None).opponent_cache
+    batched = run_cfr(50, batch=True, cache_size=None).opponent_cache
+
+    # One miss per distinct opponent key, however the keys were evaluated
+    assert per_hand.misses == batched.misses == len(batched.actions)
+    assert per_hand.hits == batched.hits
+    assert batched.forward_passes < per_hand.forward_passes
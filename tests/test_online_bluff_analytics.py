@@ -0,0 +1,18 @@
+from BNAIC_paper_files.custom_leduc_rlcard.batch_game import RAISE, FOLD
+from BNAIC_paper_files.custom_leduc_rlcard.utils import CARD2INDEX
+from BNAIC_paper_files.game_log import NO_CARD, legal_mask
+from BNAIC_paper_files.online_bluff_analytics import OnlineBluffAnalytics
+
+
+def test_summary_without_bluffs(capsys):
+    # Two strong-hand raises, folded to: no threshold bluffs and too few samples for beliefs
+    analytics = OnlineBluffAnalytics()
+    for game_num, hands in ((1, ('SA', 'H2')), (2, ('SK', 'H3'))):
+        steps = [(0, RAISE, legal_mask(range(4)), 0), (1, FOLD, legal_mask(range(3)), 0)]
+        analytics.add_game(game_num, [CARD2INDEX[card] for card in hands], NO_CARD, [1.0, -1.0], steps)
+
+    threshold_results, statistical_results = analytics.summary()
+
+    assert [results['total_bluff_attempts'] for results in threshold_results] == [0, 0]
+    assert [data['total_statistical_bluff_attempts'] for data in statistical_results] == [0, 0]
+    assert capsys.readouterr().out.count("=== SUCCESS BREAKDOWN ===") == 4
@@ -0,0 +1,163 @@
+import numpy as np
+
+from BNAIC_paper_files.custom_leduc_rlcard.public_tree import build_public_tree, chance_weights
+from BNAIC_paper_files.custom_leduc_rlcard.infoset import NUM_CHIP_STATES
+from BNAIC_paper_files.custom_leduc_rlcard.utils import NUM_CARDS, NO_PUBLIC_CARD, SHOWDOWN_WINNER
+
+CFR_VARIANTS = ('cfr', 'cfr+', 'dcfr')
+
+
+class VectorizedCFR:
+    """
+    Chance-enumerating CFR against the live DQN, run on the public betting tree.
+
+    A sweep walks the public tree of both small blind seats once and updates the info sets of
+    every hand of the CFR player at the same time. Values are (own hand, opponent hand, public
+    card) arrays, and the greedy DQN is evaluated for all opponent hands of a node in one forward
+    pass. The update of a sweep is the expectation of one sampled CFRAgainstDQNAgent.traverse_tree
+    iteration over all deals, so every reachable info set is updated on every sweep.
+
+    Updates go into cfr_agent.tables, keyed by the same info-set ids that CFRWrapper reads.
+    variant selects plain CFR, CFR+ (regrets floored at zero, linear averaging) or DCFR
+    (discounted regrets and average, with alpha, beta and gamma as in Brown & Sandholm).
+    """
+
+    def __init__(self, cfr_agent, variant='cfr+', alpha=1.5, beta=0.0, gamma=2.0):
+        if variant not in CFR_VARIANTS:
+            raise ValueError(f"Unknown CFR variant {variant!r}, expected one of {CFR_VARIANTS}")
+        self.agent = cfr_agent
+        self.tables = cfr_agent.tables
+        self.dqn_agent = cfr_agent.opponent_agent
+        self.player_id = cfr_agent.player_id
+        self.opponent_id = 1 - self.player_id
+        self.variant = variant
+        self.alpha, self.beta, self.gamma = alpha, beta, gamma
+        self.iteration = 0
+
+        self.roots = [build_public_tree(small_blind) for small_blind in range(2)]
+        # Each small blind seat has probability 1/2
+        self.chance = chance_weights() / len(self.roots)
+        # cfr_wins[c, o, p]: the CFR player's hand c beats o at showdown
+        showdown = SHOWDOWN_WINNER[:, :, :NUM_CARDS]
+        if self.player_id == 0:
+            self.cfr_wins = showdown == 0
+        else:
+            self.cfr_wins = showdown.transpose(1, 0, 2) == 1
+
+        cards = np.arange(NUM_CARDS)
+        self._preflop_cards = cards * (NUM_CARDS + 1) + NO_PUBLIC_CARD
+        self._flop_cards = cards[:, None] * (NUM_CARDS + 1) + cards[None, :]
+
+        # Greedy opponent actions per public node, recomputed when the DQN weights change
+        self._opponent_actions = {}
+        self._dqn_version = None
+
+    def _opponent_action(self, node):
+        if self.dqn_agent.train_t != self._dqn_version:
+            self._opponent_actions.clear()
+            self._dqn_version = self.dqn_agent.train_t
+        actions = self._opponent_actions.get(id(node))
+        if actions is None:
+            cards = np.arange(NUM_CARDS)
+            if node.round_counter == 0:
+                obs = node.observations(self.opponent_id, cards)
+            else:
+                obs = node.observations(self.opponent_id, np.repeat(cards, NUM_CARDS), np.tile(cards, NUM_CARDS))
+            q_values = self.dqn_agent.q_estimator.predict_nograd(obs)
+            legal = np.zeros(q_values.shape[1], dtype=bool)
+            legal[node.action_ids] = True
+            actions = np.argmax(np.where(legal, q_values, -np.inf), axis=1)
+            # Broadcast over (own hand, opponent hand, public card)
+            if node.round_counter == 0:
+                actions = actions.reshape(1, NUM_CARDS, 1)
+            else:
+                actions = actions.reshape(1, NUM_CARDS, NUM_CARDS)
+            self._opponent_actions[id(node)] = actions
+        return actions
+
+    def _walk(self, node, opponent_reach, own_reach):
+        """Expected utility of the CFR player for every (own hand, opponent hand, public card)"""
+        if node.is_terminal():
+            if node.folded >= 0:
+                return node.payoffs(1 - node.folded)[self.player_id]
+            win, lose = node.payoffs(self.player_id)[self.player_id], node.payoffs(self.opponent_id)[self.player_id]
+            return np.where(self.cfr_wins, win, lose)
+
+        if node.player != self.player_id:
+            actions = self._opponent_action(node)
+            utility = np.zeros_like(opponent_reach)
+            for action, child in zip(node.action_ids, node.children):
+                chosen = actions == action
+                if not chosen.any():
+                    continue
+                child_reach = opponent_reach * chosen
+                utility = np.where(chosen, self._walk(child, child_reach, own_reach), utility)
+            return utility
+
+        # CFR player: one info set per own hand (and public card after the flop)
+        chip_state = node.chip_state(self.player_id)
+        if node.round_counter == 0:
+            infosets = self._preflop_cards * NUM_CHIP_STATES + chip_state
+            sum_axes = (1, 2)
+            reach_weight = own_reach[:, 0]
+        else:
+            infosets = self._flop_cards * NUM_CHIP_STATES + chip_state
+            sum_axes = 1
+            reach_weight = own_reach
+        strategy = self._strategies[infosets]
+
+        utility = np.zeros_like(opponent_reach)
+        action_values = np.zeros(strategy.shape)
+        for action, child in zip(node.action_ids, node.children):
+            prob = strategy[..., action]
+            if node.round_counter == 0:
+                child_own_reach = own_reach * prob[:, None]
+                prob = prob[:, None, None]
+            else:
+                child_own_reach = own_reach * prob
+                prob = prob[:, None, :]
+            child_utility = self._walk(child, opponent_reach, child_own_reach)
+            action_values[..., action] = np.sum(opponent_reach * child_utility, axis=sum_axes)
+            utility += prob * child_utility
+
+        counterfactual_reach = np.sum(opponent_reach, axis=sum_axes)
+        node_value = np.sum(strategy * action_values, axis=-1)
+        actions = node.action_ids
+        reached = counterfactual_reach > 0
+        self._regret_delta[infosets[..., None], actions] += action_values[..., actions] - node_value[..., None]
+        self._average_delta[infosets[..., None], actions] += (reach_weight * counterfactual_reach)[..., None] * strategy[..., actions]
+        self.tables.policy[infosets[reached]] = strategy[reached]
+        self.tables.visited[infosets[reached]] = True
+        return utility
+
+    def sweep(self):
+        """One CFR iteration over all deals and both small blind seats"""
+        self._strategies = self.tables.current_strategies()
+        self._regret_delta = np.zeros_like(self.tables.regrets)
+        self._average_delta = np.zeros_like(self.tables.average_policy)
+        own_reach = np.ones((NUM_CARDS, NUM_CARDS))
+        for root in self.roots:
+            self._walk(root, self.chance, own_reach)
+
+        self.iteration += 1
+        t = self.iteration
+        regrets, average_policy = self.tables.regrets, self.tables.average_policy
+        if self.variant == 'cfr':
+            regrets += self._regret_delta
+            average_policy += self._average_delta
+        elif self.variant == 'cfr+':
+            regrets += self._regret_delta
+            np.maximum(regrets, 0, out=regrets)
+            average_policy += t * self._average_delta
+        else:
+            regrets += self._regret_delta
+            positive = regrets > 0
+            regrets[positive] *= t ** self.alpha / (t ** self.alpha + 1)
+            regrets[~positive] *= t ** self.beta / (t ** self.beta + 1)
+            average_policy += self._average_delta
+            average_policy *= (t / (t + 1)) ** self.gamma
+        self.agent.iteration += 1
+
+    def run_sweeps(self, num_sweeps):
+        for _ in range(num_sweeps):
+            self.sweep()